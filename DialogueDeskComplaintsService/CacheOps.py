@@ -0,0 +1,291 @@
+# mongo db specific
+from bson.objectid import ObjectId
+
+# others
+import re
+import time
+import asyncio
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+
+
+def normalize_message(text: str) -> str:
+    """
+    Normalizes a message for use as a cache key.
+    "  Hello!!  " and "hello" should land on the same entry.
+    """
+    text = re.sub(r"\s+", " ", str(text).lower()).strip()
+    return text.strip(" .!?,;:")
+
+
+class InMemoryCacheBackend:
+    """
+    In-process LRU cache with TTL expiry (default backend).
+    Bounded by max_size; the least recently used entry is evicted first.
+    """
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 3600):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+
+    def set(self, key: str, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+    def items(self):
+        """Snapshot of the (key, value) pairs that haven't expired yet."""
+        now = time.monotonic()
+        with self._lock:
+            return [(key, value) for key, (value, expires_at) in self._data.items() if expires_at >= now]
+
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+    def __len__(self):
+        return len(self._data)
+
+
+class MongoCacheBackend:
+    """
+    Shared cache stored in a mongo collection so all bot replicas can reuse each others responses.
+    Expiry is handled by a TTL index on "expires_at" (mongo removes expired documents roughly every minute),
+    reads also ignore expired entries so nothing stale is served in-between.
+    get_collection is called on first use so the mongo client isn't built at import.
+    Calls are blocking (pymongo); async callers go through ResponseCache.aget/aset, which run them in a thread.
+    """
+    blocking = True
+
+    def __init__(self, get_collection, ttl_seconds: float = 3600):
+        self.get_collection = get_collection
+        self.ttl_seconds = ttl_seconds
+        self._collection = None
+
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            self._collection = self.get_collection()
+            self._collection.create_index("expires_at", expireAfterSeconds=0)
+        return self._collection
+
+
+    def get(self, key: str):
+        entry = self.collection.find_one(
+            {"_id": key, "expires_at": {"$gt": datetime.now(timezone.utc)}},
+            {"value": 1, "_id": 0}
+        )
+        return entry["value"] if entry else None
+
+
+    def set(self, key: str, value):
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)
+        self.collection.update_one(
+            {"_id": key},
+            {"$set": {"value": value, "expires_at": expires_at}},
+            upsert=True
+        )
+
+
+    def clear(self):
+        self.collection.delete_many({})
+
+
+    def __len__(self):
+        return self.collection.estimated_document_count()
+
+
+class ResponseCache:
+    """
+    Cache for LLM responses that don't depend on who is asking (intent classification & general replies).
+    Complaint lodging must never go through this cache.
+    """
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else InMemoryCacheBackend()
+        self.hits = 0
+        self.misses = 0
+
+
+    @staticmethod
+    def make_key(kind: str, message: str, context: str = "") -> str:
+        return f"{kind}|{normalize_message(message)}|{context}"
+
+
+    def get(self, kind: str, message: str, context: str = ""):
+        try:
+            value = self.backend.get(self.make_key(kind, message, context))
+        except Exception as e:
+            print(f"Error reading response cache: {e}")
+            value = None
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+
+    def set(self, kind: str, message: str, value, context: str = ""):
+        try:
+            self.backend.set(self.make_key(kind, message, context), value)
+        except Exception as e:
+            print(f"Error writing response cache: {e}")
+
+
+    async def aget(self, kind: str, message: str, context: str = ""):
+        """
+        Async version of get. Blocking backends (mongo) are read in a worker thread so the event loop isn't held up.
+        """
+        if getattr(self.backend, "blocking", False):
+            return await asyncio.to_thread(self.get, kind, message, context)
+        return self.get(kind, message, context)
+
+
+    async def aset(self, kind: str, message: str, value, context: str = ""):
+        """
+        Async version of set.
+        """
+        if getattr(self.backend, "blocking", False):
+            await asyncio.to_thread(self.set, kind, message, value, context)
+        else:
+            self.set(kind, message, value, context)
+
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self.backend),
+        }
+
+
+class StatusCache:
+    """
+    Read-through cache for complaint status lookups, keyed by complaint id (as a string).
+    Only the projected fields in STATUS_FIELDS are held. Our own writes must call invalidate/invalidate_user,
+    writes from elsewhere (e.g the dashboard) are picked up by watch_status_changes or poll_status_changes.
+    """
+    STATUS_FIELDS = {"status": 1, "complaint_topic_1": 1, "receive_update": 1, "user_id": 1}
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 300):
+        self.backend = InMemoryCacheBackend(max_size=max_size, ttl_seconds=ttl_seconds)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.served_ages = deque(maxlen=1000) # age (seconds) of entries served from the cache
+
+
+    def get(self, complaint_id):
+        entry = self.backend.get(str(complaint_id))
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.served_ages.append(time.monotonic() - entry["cached_at"])
+        return entry["fields"]
+
+
+    def set(self, complaint_id, fields: dict):
+        fields = {key: fields.get(key) for key in self.STATUS_FIELDS}
+        self.backend.set(str(complaint_id), {"fields": fields, "cached_at": time.monotonic()})
+
+
+    def invalidate(self, complaint_id):
+        self.backend.delete(str(complaint_id))
+        self.invalidations += 1
+
+
+    def invalidate_user(self, user_id: str):
+        """Invalidates every cached complaint belonging to user_id (used after bulk updates)."""
+        for complaint_id, entry in self.backend.items():
+            if entry["fields"].get("user_id") == user_id:
+                self.invalidate(complaint_id)
+
+
+    def cached_ids(self) -> list:
+        return [complaint_id for complaint_id, _ in self.backend.items()]
+
+
+    def metrics(self) -> dict:
+        lookups = self.hits + self.misses
+        served_ages = sorted(self.served_ages)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "size": len(self.backend),
+            "avg_served_age_seconds": sum(served_ages) / len(served_ages) if served_ages else 0.0,
+            "max_served_age_seconds": served_ages[-1] if served_ages else 0.0,
+        }
+
+
+async def watch_status_changes(collection, status_cache: StatusCache):
+    """
+    Invalidates cached statuses from a mongo change stream (needs a replica set, which Atlas is).
+    collection is an async (motor) collection.
+    """
+    pipeline = [{"$match": {"operationType": {"$in": ["update", "replace", "delete"]}}}]
+    async with collection.watch(pipeline) as change_stream:
+        async for change in change_stream:
+            status_cache.invalidate(change["documentKey"]["_id"])
+
+
+async def poll_status_changes(collection, status_cache: StatusCache, interval: float = 10):
+    """
+    Fallback for deployments without change streams (e.g a local mongo stand-in).
+    Every interval seconds, re-reads the projected fields of all cached complaints in one query
+    and invalidates any entry that changed or no longer exists. collection is an async (motor) collection.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        cached_ids = status_cache.cached_ids()
+        if not cached_ids:
+            continue
+
+        try:
+            cursor = collection.find({"_id": {"$in": [ObjectId(i) for i in cached_ids]}}, StatusCache.STATUS_FIELDS)
+            current = {str(document["_id"]): document async for document in cursor}
+        except Exception as e:
+            print(f"Error polling complaint status changes: {e}")
+            continue
+
+        for complaint_id in cached_ids:
+            cached_fields = status_cache.backend.get(complaint_id)
+            document = current.get(complaint_id)
+            if cached_fields is None:
+                continue
+            if document is None or any(document.get(key) != cached_fields["fields"].get(key) for key in StatusCache.STATUS_FIELDS):
+                status_cache.invalidate(complaint_id)
@@ -0,0 +1,96 @@
+# mongo db specific
+from pymongo.server_api import ServerApi
+from pymongo.mongo_client import MongoClient
+
+# others
+import threading
+from config import (
+    MONGO_URI, MONGO_DB_NAME, MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_COMPRESSORS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS, MONGO_CONNECT_TIMEOUT_MS, MONGO_SOCKET_TIMEOUT_MS
+)
+
+# NOTE: this module is shared by the complaints and dashboard services. Each service is built from its own folder
+# (see the Dockerfile), so the file is copied into both - keep DialogueDeskComplaintsService/MongoClientOps.py and
+# DialogueDeskDashboardService/MongoClientOps.py identical.
+# Clients are built lazily (on first use, not at import) and there is one of each per process.
+# mongodb+srv uris resolve DNS in the MongoClient constructor, which is why nothing here runs at import time.
+
+_client = None
+_async_client = None
+_client_lock = threading.Lock()
+
+
+def _client_options() -> dict:
+    return {
+        "server_api": ServerApi('1'),
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS,
+        # zstd & snappy need zstandard / python-snappy (both in requirements.txt), missing ones are skipped with a warning
+        "compressors": MONGO_COMPRESSORS,
+    }
+
+
+def get_client() -> MongoClient:
+    """Returns the process wide (sync) client, building it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = MongoClient(MONGO_URI, **_client_options())
+    return _client
+
+
+def get_async_client():
+    """
+    Returns the process wide motor client, building it on first use.
+    Must first be called from within the running event loop.
+    """
+    global _async_client
+    if _async_client is None:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        _async_client = AsyncIOMotorClient(MONGO_URI, **_client_options())
+    return _async_client
+
+
+def get_database():
+    return get_client()[MONGO_DB_NAME]
+
+
+def get_async_database():
+    return get_async_client()[MONGO_DB_NAME]
+
+
+def warm_up() -> bool:
+    """
+    Builds the client and pings the server so DNS resolution, server selection and the first pool
+    connection happen at readiness time instead of on the first user request.
+    """
+    try:
+        get_client().admin.command("ping")
+        return True
+    except Exception as e:
+        print(f"ERROR warming up mongo client: {e}")
+        return False
+
+
+async def awarm_up() -> bool:
+    """Async version of warm_up."""
+    try:
+        await get_async_client().admin.command("ping")
+        return True
+    except Exception as e:
+        print(f"ERROR warming up mongo client: {e}")
+        return False
+
+
+def close_clients():
+    global _client, _async_client
+    if _client is not None:
+        _client.close()
+        _client = None
+    if _async_client is not None:
+        _async_client.close()
+        _async_client = None
@@ -0,0 +1,100 @@
+# others
+import time
+import asyncio
+from collections import deque, defaultdict
+
+
+class ChatScheduler:
+    """
+    Bounded worker pool sitting in front of the agent.
+        - max_workers: number of messages being processed (i.e LLM calls in flight) at any one time.
+        - max_queue_size: max number of messages waiting across all chats. Anything above that is shed.
+        - messages from the same chat are always processed one at a time and in the order they came in.
+    """
+    def __init__(self, max_workers: int = 8, max_queue_size: int = 200):
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+
+        self._pending = defaultdict(deque) # chat_id -> deque of (job, enqueued_at)
+        self._active_chats = set() # chats currently being processed by a worker
+        self._ready_chats = asyncio.Queue() # chats with pending jobs that no worker holds
+        self._workers = []
+
+        # metrics
+        self.queue_depth = 0
+        self.in_flight = 0
+        self.processed = 0
+        self.failed = 0
+        self.shed = 0
+        self.wait_times = deque(maxlen=1000) # seconds, most recent jobs only
+
+
+    def start(self):
+        """Starts the workers. Must be called from within the running event loop."""
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_workers)]
+
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+
+    def submit(self, chat_id, job) -> bool:
+        """
+        Queues job (a no-argument coroutine function) for chat_id.
+        Returns False if the queue is full and the job was shed, so the caller can tell the user we're busy.
+        """
+        if self.queue_depth >= self.max_queue_size:
+            self.shed += 1
+            return False
+
+        self._pending[chat_id].append((job, time.monotonic()))
+        self.queue_depth += 1
+
+        # only one worker holds a chat at a time, this keeps per-chat ordering
+        if chat_id not in self._active_chats and len(self._pending[chat_id]) == 1:
+            self._active_chats.add(chat_id)
+            self._ready_chats.put_nowait(chat_id)
+        return True
+
+
+    async def _worker(self):
+        while True:
+            chat_id = await self._ready_chats.get()
+            job, enqueued_at = self._pending[chat_id].popleft()
+            self.queue_depth -= 1
+            self.wait_times.append(time.monotonic() - enqueued_at)
+
+            self.in_flight += 1
+            try:
+                await job()
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"Error processing message for chat {chat_id}: {e}")
+            finally:
+                self.in_flight -= 1
+
+            # hand the chat back if it has more messages, otherwise release it
+            if self._pending[chat_id]:
+                self._ready_chats.put_nowait(chat_id)
+            else:
+                del self._pending[chat_id]
+                self._active_chats.discard(chat_id)
+
+
+    def metrics(self) -> dict:
+        wait_times = sorted(self.wait_times)
+        return {
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "processed": self.processed,
+            "failed": self.failed,
+            "shed": self.shed,
+            "avg_wait_seconds": sum(wait_times) / len(wait_times) if wait_times else 0.0,
+            "p95_wait_seconds": wait_times[int(0.95 * (len(wait_times) - 1))] if wait_times else 0.0,
+            "max_wait_seconds": wait_times[-1] if wait_times else 0.0,
+        }
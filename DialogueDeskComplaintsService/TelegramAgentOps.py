@@ -1,31 +1,155 @@
 # langchain related
 from langchain_openai import ChatOpenAI
 
+# telegram related
+from telegram.helpers import escape_markdown
+
 
 # db ops related
 from ComplaintsMongoDBOps import *
+from MongoClientOps import get_database
+
+# caching related
+from CacheOps import ResponseCache, InMemoryCacheBackend, MongoCacheBackend
 
 # others
+import re
+import asyncio
 import json
-from config import OPEN_AI_KEY
+from datetime import date
+from config import (
+    OPEN_AI_KEY, FUSED_INTENT_EXTRACTION,
+    RESPONSE_CACHE_BACKEND, RESPONSE_CACHE_MAX_SIZE, RESPONSE_CACHE_TTL_SECONDS,
+    DEDUP_FLAG_THRESHOLD, DEDUP_REUSE_THRESHOLD
+)
+
+
+INTENTS = ("complaint", "get_complaint_status", "change_notification_preference", "regular_convo")
+
+# fast-path (rule based) routing patterns
+OBJECT_ID_PATTERN = re.compile(r"\b[0-9a-fA-F]{24}\b")
+# an imperative notification command, matched against the whole message once the complaint id is removed
+# e.g "stop notifications for <id>", "please turn on updates on my complaint <id>"
+NOTIFICATION_COMMAND_PATTERN = re.compile(
+    r"(?:please\s+)?"
+    r"(?:(?P<stop>cancel|stop|unsubscribe\s+from|mute|disable|turn\s+off)|(?P<start>resume|receive|start|subscribe\s+to|unmute|enable|turn\s+on))"
+    r"\s+(?:my\s+|the\s+)?(?:notifications?|updates?)"
+    r"(?:\s+(?:for|on|about)(?:\s+(?:my|the|this))?(?:\s+(?:complaint|report))?)?"
+    r"(?:\s+please)?",
+    re.IGNORECASE
+)
+# the bulk version only accepts the exact phrase, e.g "stop all notifications", "turn on all my updates"
+ALL_NOTIFICATIONS_COMMAND_PATTERN = re.compile(
+    r"(?:please\s+)?"
+    r"(?:(?P<stop>cancel|stop|mute|disable|turn\s+off)|(?P<start>resume|receive|start|unmute|enable|turn\s+on))"
+    r"\s+all\s+(?:my\s+)?(?:notifications|updates)"
+    r"(?:\s+please)?",
+    re.IGNORECASE
+)
+STATUS_PATTERN = re.compile(r"\b(status|progress|update|check|where|any news|resolved|pending)\b", re.IGNORECASE)
+LIST_COMPLAINTS_PATTERN = re.compile(
+    r"\b(list|show|see|view|what are|which are)\b.*\bmy\b.*\b(open |pending )?(complaints|reports)\b", re.IGNORECASE
+)
+DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+FAST_STATUS_MAX_WORDS = 12 # longer messages with an id could be a new complaint, so those go to the LLM
+
+# slash commands handled without the LLM -> intent (and new_status where relevant)
+COMMAND_ROUTES = {
+    "report_update": ("get_complaint_status", None),
+    "cancel_notifications": ("change_notification_preference", "no"),
+    "receive_notifications": ("change_notification_preference", "yes"),
+}
+
+
+def _notification_command(text: str, pattern: re.Pattern = NOTIFICATION_COMMAND_PATTERN):
+    """
+    "no" / "yes" when text is nothing but a stop / resume notifications command, otherwise None.
+    Anything more than the command words (a question, a complaint, "I don't ...") is left to the LLM,
+    since this changes the user's settings without asking.
+    """
+    text = " ".join(text.split()).strip(" .!?,:;-")
+    match = pattern.fullmatch(text)
+    if not match:
+        return None
+    return "no" if match.group("stop") else "yes"
+
+
+def fast_route(input_string: str):
+    """
+    Rule based pre-router. Returns the same slots dict as classify_and_extract
+    when the message is unambiguous, otherwise None (meaning; ask the LLM).
+    """
+    complaint_ids = OBJECT_ID_PATTERN.findall(input_string)
+
+    if not complaint_ids:
+        # "stop all notifications" (exact phrase only, it is a bulk write), "show my open complaints"
+        new_status = _notification_command(input_string, ALL_NOTIFICATIONS_COMMAND_PATTERN)
+        if new_status:
+            return {"intent": "change_all_notification_preferences", "new_status": new_status}
+        if LIST_COMPLAINTS_PATTERN.search(input_string):
+            return {"intent": "list_open_complaints"}
+        return None
+
+    if len(complaint_ids) != 1:
+        return None
+    complaint_id = complaint_ids[0].lower()
+    remaining_text = OBJECT_ID_PATTERN.sub("", input_string).strip(" .!?,:;-\n")
+
+    new_status = _notification_command(remaining_text)
+    if new_status:
+        return {"intent": "change_notification_preference", "complaint_id": complaint_id, "new_status": new_status}
+    if not remaining_text or (
+        STATUS_PATTERN.search(remaining_text) and len(remaining_text.split()) <= FAST_STATUS_MAX_WORDS
+    ):
+        return {"intent": "get_complaint_status", "complaint_id": complaint_id}
+    return None
+
+
+def md(text) -> str:
+    """
+    Escapes text for telegram's MarkdownV2; every agent reply is sent with parse_mode="MarkdownV2",
+    so anything from the db or the LLM must go through this.
+    """
+    return escape_markdown(str(text), version=2)
+
+
+def build_response_cache() -> ResponseCache:
+    """
+    Builds the response cache from config. "mongo" shares cached responses between bot replicas.
+    """
+    if RESPONSE_CACHE_BACKEND == "mongo":
+        backend = MongoCacheBackend(lambda: get_database()["DialogueDeskResponseCache"], ttl_seconds=RESPONSE_CACHE_TTL_SECONDS)
+    else:
+        backend = InMemoryCacheBackend(max_size=RESPONSE_CACHE_MAX_SIZE, ttl_seconds=RESPONSE_CACHE_TTL_SECONDS)
+    return ResponseCache(backend)
 
 
 class DialogueDeskAgent:
-    def __init__(self):
+    def __init__(self, fused_extraction: bool = None, response_cache: ResponseCache = None):
         self.llm = ChatOpenAI(
             model="gpt-3.5-turbo",
             temperature=0,
             max_tokens=800,
             api_key=OPEN_AI_KEY
         )
+        # JSON mode makes the fused classify+extract response safe to json.loads
+        self.json_llm = self.llm.bind(response_format={"type": "json_object"})
+
+        # fused = 1 LLM round-trip per message, otherwise classify first then extract (2 round-trips)
+        self.fused_extraction = FUSED_INTENT_EXTRACTION if fused_extraction is None else fused_extraction
 
+        # caches intents & general replies for small talk. Never used for complaint lodging.
+        self.response_cache = response_cache if response_cache is not None else build_response_cache()
 
-    def classify_intent(self, input_string: str):
+
+    # prompt builders
+    # ===================================================================================================
+    @staticmethod
+    def _classification_prompt(input_string: str) -> str:
         """
-        Classifies the user's message to determine if it's about a complaint,
-        complaint status, notification preference, or regular conversation.
+        Prompt used to classify the intent of a message.
         """
-        classification_prompt = f"""
+        return f"""
         Classify the following message into one of these intents:
         1. "complaint" - If the message is a complaint that needs to be logged. Make sure to analyse properly before you conclude something is a complaint or not.
         e.g, a user might say "they think they have a complaint"... In such cases, encourage them to share details. Do not classify non-complaint as complaint.
@@ -44,15 +168,14 @@ class DialogueDeskAgent:
         - change_notification_preference
         - regular_convo
         """
-        response = self.llm.invoke(classification_prompt).content.strip().lower()
-        return response
 
 
-    def extract_complaint_details(self, input_string: str):
+    @staticmethod
+    def _extraction_prompt(input_string: str) -> str:
         """
-        Extracts complaint details such as complaint text, topics, and status.
+        Prompt used to extract complaint details from a message.
         """
-        extraction_prompt = f"""
+        return f"""
         Extract the following complaint details from the message:
         - Date: Current date
         - Complaint Text: Detailed description of the issue
@@ -74,115 +197,360 @@ class DialogueDeskAgent:
 
         Message to extract: "{input_string}"
         """
-        complaint_json = self.llm.invoke(extraction_prompt).content
-        complaint_data = json.loads(complaint_json)
-        return complaint_data
 
 
-    def lodge_complaint_to_db(self, complaint_data):
+    @staticmethod
+    def _id_and_status_prompt(input_string: str) -> str:
         """
-        Logs the complaint to the database and returns the complaint ID.
+        Prompt used to extract a complaint ID and new notification status.
+        """
+        return f"""
+        Check and extract:
+            - "complaint_id": "<complaint_id>"
+            - "new_status": "<new_status>"  # Only if updating notification preferences. This should be yes/no
+
+        Return only the extracted details in JSON format:
+        Message to extract from: "{input_string}"
         """
-        complaint_id = lodge_complaint(json.dumps(complaint_data))
-        return complaint_id
-    
 
-    def get_complaint_status(self, complaint_id: str):
+
+    @staticmethod
+    def _complaint_id_prompt(input_string: str) -> str:
         """
-        Retrieves the status of a complaint based on the complaint ID.
+        Prompt used to extract a complaint ID.
+        """
+        return f"""
+        Extract the Complaint ID from the following message:
+        "{input_string}"
+
+        Respond only with the complaint ID.
         """
-        return db_get_complaint_status(complaint_id)
 
 
-    def update_notification_status(self, complaint_id: str, new_status: str, users_first_name):
+    @staticmethod
+    def _general_response_prompt(input_string: str, context_and_meta: str) -> str:
         """
-        Updates the notification preference for a given complaint.
+        Prompt used for general (non complaint related) responses.
         """
-        new_stat, topic = change_notification_preference(complaint_id, new_status)
+        return f"""
+        Provide a helpful, conversational response to:
+        "{input_string}"
 
-        if new_stat == "no":
-            message = f"Alright {users_first_name}, you will no longer receive updates on your report about {topic}"
-            
-        elif new_stat == "yes":
-            message = f"Sure thing {users_first_name}, you will now be receiving updates on your report about {topic}"
+        The following is some meta-data about the user and context:
+        "{context_and_meta}"
 
-        return message
+        Keep responses short and always in first-person place without mentioning the metadata.
+        You can refer to the user using their name or date where necessary but never repeat verpose metadata or context that isnt necessary
+        One more thing, you need to project company image so never engage in any slander that may come as a reslt of users input.
+        """
 
 
-    def handle_message(self, input_string: str, context_and_meta: str, users_first_name):
+    @staticmethod
+    def _fused_prompt(input_string: str) -> str:
         """
-        Main handler that processes the user's message based on the classified intent.
+        Prompt used to classify the intent of a message and extract all its slots in a single call.
         """
-        intent = self.classify_intent(input_string)
-        
-        if intent == "complaint":
-            # Extract complaint details
-            complaint_data = self.extract_complaint_details(input_string)
-            complaint_id = self.lodge_complaint_to_db(complaint_data)
-            
-            response = (
-                "Sorry about the inconvenience, your complaint has been logged  \n\nComplaint ID \\(Click to copy\\):"
-                f"  **\n\n`{complaint_id}`**"
-        )
-            
-        elif intent == "get_complaint_status":
-            complaint_id = self.extract_complaint_id(input_string)
-            status = self.get_complaint_status(complaint_id)
-            response = f"Your complaint status is: {status}"
+        return f"""
+        Classify the following message into one of these intents:
+        1. "complaint" - If the message is a complaint that needs to be logged. Make sure to analyse properly before you conclude something is a complaint or not.
+        e.g, a user might say "they think they have a complaint"... In such cases, encourage them to share details. Do not classify non-complaint as complaint.
 
-        elif intent == "change_notification_preference":
-            complaint_id, new_status = self.extract_id_and_new_status(input_string)
-            response = self.update_notification_status(complaint_id, new_status, users_first_name)
+        2. "get_complaint_status" - If the user wants to know what the status of an existing complaint is.
+        3. "change_notification_preference" - If the user wants to update their notification preferences.
+        4. "regular_convo" - If the message is part of a normal conversation that doesn't relate to complaints
+        or the user says they think they have a complaint or something of such nature.
+
+        Then extract the details relevant to that intent:
+        - For "complaint": the complaint date (current date), a detailed complaint text, a primary topic and a secondary topic (if applicable).
+        - For "get_complaint_status": the complaint ID.
+        - For "change_notification_preference": the complaint ID and the new status (yes/no).
+        Use null for anything that does not apply.
+
+        Respond in strict JSON format:
+        {{
+             "intent": "complaint | get_complaint_status | change_notification_preference | regular_convo",
+             "complaint": {{
+                 "date": "YYYY-MM-DD",
+                 "complaint_text": "...",
+                 "complaint_topic_1": "...",
+                 "complaint_topic_2": "...",
+                 "receive_update": "yes",
+                 "status": "pending"
+             }},
+             "complaint_id": "...",
+             "new_status": "yes | no"
+        }}
 
+        Message:
+        "{input_string}"
+        """
+    # ===================================================================================================
+
+
+    @staticmethod
+    def _parse_fused_response(response: str) -> dict:
+        """
+        Parses the fused classify+extract response, falling back to regular_convo if the intent is unknown.
+        """
+        try:
+            extracted_data = json.loads(response)
+        except json.JSONDecodeError:
+            print(f"Error parsing fused extraction response: {response}")
+            return {"intent": "regular_convo"}
+
+        intent = str(extracted_data.get("intent") or "").strip().lower()
+        extracted_data["intent"] = intent if intent in INTENTS else "regular_convo"
+
+        complaint = extracted_data.get("complaint")
+        if intent == "complaint" and isinstance(complaint, dict) and complaint.get("complaint_text"):
+            complaint["receive_update"] = "yes"
+            complaint["status"] = "pending"
         else:
-            response = self.generate_general_response(input_string, context_and_meta)
+            extracted_data["complaint"] = None
+        return extracted_data
+
+
+    async def _acache_intent(self, input_string: str, intent: str):
+        """
+        Stores a classified intent, skipping complaints so complaint lodging never depends on the cache.
+        """
+        if intent in INTENTS and intent != "complaint":
+            await self.response_cache.aset("intent", input_string, intent)
+
+
+    @staticmethod
+    def _format_open_complaints(open_complaints: list, users_first_name) -> str:
+        if not open_complaints:
+            return md(f"You don't have any open complaints at the moment {users_first_name}")
+
+        lines = [md(f"Here are your open complaints {users_first_name}:")]
+        for complaint in open_complaints:
+            notifications = "on" if complaint.get("receive_update") == "yes" else "off"
+            lines.append(
+                md(f"- {complaint.get('complaint_topic_1', 'Complaint')} on {complaint.get('date', '')}, ID: ")
+                + f"`{complaint['_id']}`" + md(f", notifications {notifications}")
+            )
+        return "\n".join(lines)
+
+
+    @staticmethod
+    def _format_bulk_notification_update(updated: int, new_status: str, users_first_name) -> str:
+        if not updated:
+            return md(f"You don't have any open complaints at the moment {users_first_name}")
+        if new_status == "no":
+            return md(f"Alright {users_first_name}, you will no longer receive updates on any of your {updated} open reports")
+        return md(f"Sure thing {users_first_name}, you will now be receiving updates on all {updated} of your open reports")
+
+
+    def match_duplicate(self, input_string: str, context_and_meta: str):
+        """
+        Checks the dedup index for a near-duplicate of the complaint.
+        Output:
+            (match or None, complaint_data or None) - complaint_data is only built when the match is close enough
+            to reuse the canonical complaint's topics, which saves the extraction LLM call.
+        """
+        match = dedup_index.query(input_string, threshold=DEDUP_FLAG_THRESHOLD)
+        if not match or match["similarity"] < DEDUP_REUSE_THRESHOLD or not match["complaint_topic_1"]:
+            return match, None
+
+        message_dates = DATE_PATTERN.findall(context_and_meta)
+        complaint_data = {
+            "date": message_dates[0] if message_dates else date.today().strftime("%Y-%m-%d"),
+            "complaint_text": input_string.strip(),
+            "complaint_topic_1": match["complaint_topic_1"],
+            "complaint_topic_2": match["complaint_topic_2"],
+            "receive_update": "yes",
+            "status": "pending"
+        }
+        return match, complaint_data
+
+
+    @staticmethod
+    def _link_duplicate(complaint_data: dict, match):
+        if match:
+            complaint_data["duplicate_of"] = match["canonical_id"]
+            complaint_data["duplicate_similarity"] = match["similarity"]
+
+
+    # message handling - ainvoke & motor only, so the bot's event loop is never blocked.
+    # handle_message is a thin sync wrapper for scripts and the shell.
+    # ===================================================================================================
+    async def aclassify_and_extract(self, input_string: str) -> dict:
+        """
+        Classifies the user's message and extracts the slots for that intent in one LLM call.
+        Output:
+            {"intent": ..., "complaint": {...} | None, "complaint_id": ... | None, "new_status": ... | None}
+        """
+        if await self.response_cache.aget("intent", input_string) == "regular_convo":
+            return {"intent": "regular_convo"}
+
+        response = (await self.json_llm.ainvoke(self._fused_prompt(input_string))).content
+        slots = self._parse_fused_response(response)
+        if slots["intent"] == "regular_convo":
+            await self._acache_intent(input_string, "regular_convo")
+        return slots
+
+
+    async def aclassify_intent(self, input_string: str):
+        """
+        Classifies the user's message to determine if it's about a complaint,
+        complaint status, notification preference, or regular conversation.
+        """
+        cached_intent = await self.response_cache.aget("intent", input_string)
+        if cached_intent is not None:
+            return cached_intent
+
+        classification_prompt = self._classification_prompt(input_string)
+        response = (await self.llm.ainvoke(classification_prompt)).content.strip().lower()
+        await self._acache_intent(input_string, response)
         return response
 
 
-    def extract_id_and_new_status(self, input_string: str):
+    async def aextract_complaint_details(self, input_string: str):
         """
-        Extracts complaint ID and new status (yes/no) for updating preferences.
+        Extracts complaint details such as complaint text, topics, and status.
         """
-        extraction_prompt = f"""
-        Check and extract:
-            - "complaint_id": "<complaint_id>"
-            - "new_status": "<new_status>"  # Only if updating notification preferences. This should be yes/no
+        complaint_json = (await self.llm.ainvoke(self._extraction_prompt(input_string))).content
+        return json.loads(complaint_json)
 
-        Return only the extracted details in JSON format:
-        Message to extract from: "{input_string}"
+
+    async def alodge_complaint_to_db(self, complaint_data):
+        """
+        Logs the complaint to the database and returns the complaint ID.
+        """
+        return await alodge_complaint(complaint_data)
+
+
+    async def aget_complaint_status(self, complaint_id: str):
+        """
+        Retrieves the status of a complaint based on the complaint ID.
+        """
+        return await adb_get_complaint_status(complaint_id)
+
+
+    async def aupdate_notification_status(self, complaint_id: str, new_status: str, users_first_name):
+        """
+        Updates the notification preference for a given complaint.
+        """
+        new_stat, topic = await achange_notification_preference(complaint_id, new_status)
+
+        if new_stat == "no":
+            message = f"Alright {users_first_name}, you will no longer receive updates on your report about {topic}"
+        elif new_stat == "yes":
+            message = f"Sure thing {users_first_name}, you will now be receiving updates on your report about {topic}"
+        else:
+            message = f"Sorry {users_first_name}, I couldn't find that complaint, so your notification preference was not changed"
+
+        return md(message)
+
+
+    async def aextract_id_and_new_status(self, input_string: str):
         """
-        extraction_response = self.llm.invoke(extraction_prompt).content
+        Extracts complaint ID and new status (yes/no) for updating preferences.
+        """
+        extraction_response = (await self.llm.ainvoke(self._id_and_status_prompt(input_string))).content
         extracted_data = json.loads(extraction_response)
         return extracted_data.get("complaint_id"), extracted_data.get("new_status")
 
 
-    def extract_complaint_id(self, input_string: str):
+    async def aextract_complaint_id(self, input_string: str):
         """
         Extracts the complaint ID from the user's input string.
         """
+        return (await self.llm.ainvoke(self._complaint_id_prompt(input_string))).content.strip()
 
-        extraction_prompt = f"""
-        Extract the Complaint ID from the following message:
-        "{input_string}"
 
-        Respond only with the complaint ID.
+    async def agenerate_general_response(self, input_string: str, context_and_meta: str):
         """
-        return self.llm.invoke(extraction_prompt).content.strip()
+        Generates a general response for messages that don't relate to a complaint.
+        """
+        cached_response = await self.response_cache.aget("general_response", input_string, context_and_meta)
+        if cached_response is not None:
+            return cached_response
 
+        response = (await self.llm.ainvoke(self._general_response_prompt(input_string, context_and_meta))).content
+        await self.response_cache.aset("general_response", input_string, response, context_and_meta)
+        return response
 
-    def generate_general_response(self, input_string: str, context_and_meta:str):
+
+    async def ahandle_message(self, input_string: str, context_and_meta: str, users_first_name, user_id: str = None):
         """
-        Generates a general response for messages that don't relate to a complaint.
+        Main handler that processes the user's message based on the classified intent.
+        user_id (telegram user id) tags lodged complaints with their owner and is needed for the "all my complaints" intents.
         """
-        response_prompt = f"""
-        Provide a helpful, conversational response to:
-        "{input_string}"
+        slots = fast_route(input_string)
+        if slots:
+            intent = slots["intent"]
+        elif self.fused_extraction:
+            slots = await self.aclassify_and_extract(input_string)
+            intent = slots["intent"]
+        else:
+            slots = {}
+            intent = await self.aclassify_intent(input_string)
 
-        The following is some meta-data about the user and context:
-        "{context_and_meta}"
+        if intent == "complaint":
+            duplicate, complaint_data = self.match_duplicate(input_string, context_and_meta)
+            complaint_data = complaint_data or slots.get("complaint") or await self.aextract_complaint_details(input_string)
+            complaint_data["user_id"] = user_id
+            self._link_duplicate(complaint_data, duplicate)
+            complaint_id = await self.alodge_complaint_to_db(complaint_data)
+            if complaint_id:
+                dedup_index.add(complaint_id, input_string, complaint_data)
 
-        Keep responses short and always in first-person place without mentioning the metadata.
-        You can refer to the user using their name or date where necessary but never repeat verpose metadata or context that isnt necessary
-        One more thing, you need to project company image so never engage in any slander that may come as a reslt of users input.
+            response = (
+                "Sorry about the inconvenience, your complaint has been logged  \n\nComplaint ID \\(Click to copy\\):"
+                f"  **\n\n`{complaint_id}`**"
+            )
+
+        elif intent == "get_complaint_status":
+            complaint_id = slots.get("complaint_id") or await self.aextract_complaint_id(input_string)
+            status = await self.aget_complaint_status(complaint_id)
+            response = md(f"Your complaint status is: {status}")
+
+        elif intent == "change_notification_preference":
+            complaint_id, new_status = slots.get("complaint_id"), slots.get("new_status")
+            if not (complaint_id and new_status):
+                complaint_id, new_status = await self.aextract_id_and_new_status(input_string)
+            response = await self.aupdate_notification_status(complaint_id, new_status, users_first_name)
+
+        elif intent == "change_all_notification_preferences" and user_id:
+            updated = await achange_all_notification_preferences(user_id, slots["new_status"])
+            response = self._format_bulk_notification_update(updated, slots["new_status"], users_first_name)
+
+        elif intent == "list_open_complaints" and user_id:
+            response = self._format_open_complaints(await alist_open_complaints(user_id), users_first_name)
+
+        else:
+            response = md(await self.agenerate_general_response(input_string, context_and_meta))
+        return response
+
+
+    def handle_message(self, input_string: str, context_and_meta: str, users_first_name, user_id: str = None):
+        """
+        Sync wrapper around ahandle_message, don't call it from a running event loop (i.e the bot).
+        """
+        return asyncio.run(self.ahandle_message(input_string, context_and_meta, users_first_name, user_id))
+
+
+    async def ahandle_command(self, command: str, args: list, users_first_name, user_id: str = None):
+        """
+        Handles the /report_update, /cancel_notifications and /receive_notifications commands without the LLM.
+        args are the words typed after the command; the first valid complaint ID among them is used.
+        Without an ID the command applies to all of the user's open complaints.
         """
-        return self.llm.invoke(response_prompt).content
\ No newline at end of file
+        intent, new_status = COMMAND_ROUTES[command]
+        complaint_ids = OBJECT_ID_PATTERN.findall(" ".join(args))
+
+        if not complaint_ids:
+            if not user_id:
+                return md(f"Please send the command with your complaint ID, e.g /{command} <complaint ID>")
+            if intent == "get_complaint_status":
+                return self._format_open_complaints(await alist_open_complaints(user_id), users_first_name)
+            updated = await achange_all_notification_preferences(user_id, new_status)
+            return self._format_bulk_notification_update(updated, new_status, users_first_name)
+
+        if intent == "get_complaint_status":
+            status = await self.aget_complaint_status(complaint_ids[0].lower())
+            return md(f"Your complaint status is: {status}")
+        return await self.aupdate_notification_status(complaint_ids[0].lower(), new_status, users_first_name)
+    # ===================================================================================================
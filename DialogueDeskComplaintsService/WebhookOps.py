@@ -0,0 +1,77 @@
+# Telegram related
+from telegram import Update
+
+# others
+import hmac
+import secrets
+from aiohttp import web
+
+
+SECRET_TOKEN_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def build_webhook_app(application, secret_token: str, webhook_path: str = "/telegram", health_callback=None) -> web.Application:
+    """
+    aiohttp app receiving Telegram updates.
+        POST {webhook_path} -> verifies the secret token, queues the update and acknowledges straight away.
+                               The PTB application processes queued updates in the background.
+        GET /health         -> liveness/readiness + whatever health_callback returns (e.g metrics).
+    Can be tested locally by POSTing recorded Update JSON payloads with the secret token header.
+    secret_token is required, otherwise anyone reaching the endpoint could post updates as any user.
+    """
+    if not secret_token:
+        raise ValueError("A webhook secret token is required")
+
+    async def receive_update(request: web.Request) -> web.Response:
+        if not hmac.compare_digest(request.headers.get(SECRET_TOKEN_HEADER, ""), secret_token):
+            return web.Response(status=403)
+
+        try:
+            update = Update.de_json(await request.json(), application.bot)
+        except Exception as e:
+            print(f"Error parsing webhook update: {e}")
+            return web.Response(status=400)
+
+        await application.update_queue.put(update)
+        return web.Response(status=200)
+
+
+    async def health(request: web.Request) -> web.Response:
+        body = {"status": "ok" if application.running else "starting"}
+        if health_callback is not None:
+            body.update(health_callback())
+        return web.json_response(body, status=200 if application.running else 503)
+
+
+    webhook_app = web.Application()
+    webhook_app.router.add_post(webhook_path, receive_update)
+    webhook_app.router.add_get("/health", health)
+    return webhook_app
+
+
+async def start_webhook_server(application, port: int, secret_token: str, webhook_url: str = None,
+                               webhook_path: str = "/telegram", health_callback=None) -> web.AppRunner:
+    """
+    Starts the webhook server on port and (if webhook_url is set) registers the webhook with Telegram.
+    Leave webhook_url empty for local testing. Returns the runner so it can be cleaned up on shutdown.
+    Without a secret_token a random one is generated for this run and registered with Telegram; set
+    WEBHOOK_SECRET_TOKEN when several replicas share the webhook (or to POST test updates locally).
+    """
+    if not secret_token:
+        if not webhook_url:
+            raise ValueError("Set WEBHOOK_SECRET_TOKEN to run the webhook server without registering it (local testing)")
+        secret_token = secrets.token_urlsafe(32) # telegram allows A-Z, a-z, 0-9, _ and -
+        print("No WEBHOOK_SECRET_TOKEN set, using a generated secret for this run.")
+
+    runner = web.AppRunner(build_webhook_app(application, secret_token, webhook_path, health_callback))
+    await runner.setup()
+    await web.TCPSite(runner, "0.0.0.0", port).start()
+
+    if webhook_url:
+        await application.bot.set_webhook(
+            url=f"{webhook_url.rstrip('/')}{webhook_path}",
+            secret_token=secret_token,
+            allowed_updates=Update.ALL_TYPES
+        )
+    print(f"Webhook server listening on port {port}")
+    return runner
@@ -5,10 +5,23 @@ from telegram.ext import ApplicationBuilder, CommandHandler, MessageHandler, fil
 # others
 
 import asyncio
-from config import TELEGRAM_API_KEY
-from TelegramAgentOps import DialogueDeskAgent
+from config import (
+    TELEGRAM_API_KEY, BOT_MAX_WORKERS, BOT_MAX_QUEUE_SIZE, BOT_METRICS_INTERVAL_SECONDS,
+    STATUS_CACHE_INVALIDATOR, STATUS_CACHE_POLL_INTERVAL_SECONDS,
+    BOT_MODE, PORT, WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_SECRET_TOKEN,
+    COMPLAINT_ROLLUPS_ENABLED, ROLLUP_RECONCILE_INTERVAL_SECONDS, ROLLUP_FULL_REBUILD_SECONDS
+)
+from SchedulerOps import ChatScheduler
+from WebhookOps import start_webhook_server
+from MongoClientOps import awarm_up, close_clients
+from ComplaintsMongoDBOps import (
+    complaint_writer, status_cache, aensure_complaint_indexes, arun_status_invalidator, abuild_dedup_index,
+    arun_rollup_reconciler
+)
+from TelegramAgentOps import DialogueDeskAgent, COMMAND_ROUTES
 
 agent = DialogueDeskAgent()
+scheduler = ChatScheduler(max_workers=BOT_MAX_WORKERS, max_queue_size=BOT_MAX_QUEUE_SIZE)
 
 # start command definition
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -32,20 +45,55 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     )
 
 
+# /report_update, /cancel_notifications & /receive_notifications go straight to the db (no LLM)
+async def fast_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    command = update.message.text.split()[0].lstrip("/").split("@")[0]
+    users_first_name = str(update.effective_user.first_name)
+
+    try:
+        agent_response = await agent.ahandle_command(
+            command, context.args or [], users_first_name, str(update.effective_user.id)
+        )
+        await update.message.reply_text(agent_response, parse_mode="MarkdownV2")
+    except Exception as e:
+        print(f"Error in handling /{command}: {e}")
+        await update.message.reply_text(
+            "Oh ohh... I can't respond right now. Please try again later 🤧😷"
+        )
+
+
+# Define the /make_report command
+async def make_report(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    await update.message.reply_text(
+        "Sure, go ahead and type your complaint/report in as much detail as you can and I'll log it."
+    )
+
+
 async def respond(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    # Queue the message; the scheduler limits LLM concurrency and keeps each chat's messages in order
+    accepted = scheduler.submit(update.effective_chat.id, lambda: answer_message(update))
+
+    if not accepted:
+        await update.message.reply_text(
+            "We're receiving a lot of messages right now 🙏🏾 Please try again in a few minutes."
+        )
+
+
+async def answer_message(update: Update) -> None:
     user_message = update.message.text
     message_date = str(update.message.date.strftime('%Y-%m-%d'))
     user_id = str(update.effective_user.id)
     users_first_name = str(update.effective_user.first_name)
 
     try:
-        # Call the AsyncAgent's answer method to get a response
-        agent_response = agent.handle_message(
+        # Call the agent's async handler so other chats keep being served while this one waits on the LLM
+        agent_response = await agent.ahandle_message(
             f"{user_message}.",
             f"This message was sent on date: {message_date}. ",
-            users_first_name
+            users_first_name,
+            user_id
         )
-        agent_response = agent_response.replace("!", "\!").replace(".", "\.").replace("-", "\-")
+        # agent replies are already MarkdownV2 (db / LLM text escaped by the agent)
         await update.message.reply_text(agent_response, parse_mode="MarkdownV2")
     
     except Exception as e:
@@ -55,24 +103,70 @@ async def respond(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         )
 
 
+async def log_metrics():
+    while True:
+        await asyncio.sleep(BOT_METRICS_INTERVAL_SECONDS)
+        print(f"Scheduler metrics: {scheduler.metrics()}")
+        print(f"Response cache metrics: {await asyncio.to_thread(agent.response_cache.stats)}") # counts a mongo collection
+        print(f"Status cache metrics: {status_cache.metrics()}")
+
+
 async def main():
     print("Starting bot...")
-    application = ApplicationBuilder().token(TELEGRAM_API_KEY).build()
+    # concurrent_updates lets PTB dispatch updates from different chats at the same time instead of one after the other
+    application = ApplicationBuilder().token(TELEGRAM_API_KEY).concurrent_updates(True).build()
     
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("help", help_command))
+    application.add_handler(CommandHandler("make_report", make_report))
+    application.add_handler(CommandHandler(list(COMMAND_ROUTES), fast_command))
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, respond))
     
     print("Bot running...")
 
+    # connect to mongo (dns, server selection, first pooled connection) before we start taking messages
+    await awarm_up()
     await application.initialize()
     await application.start()
-    await application.updater.start_polling(allowed_updates=Update.ALL_TYPES)
+    await aensure_complaint_indexes()
+    await complaint_writer.start()
+    await abuild_dedup_index()
+    scheduler.start()
+    metrics_task = asyncio.create_task(log_metrics())
+    invalidator_task = asyncio.create_task(
+        arun_status_invalidator(STATUS_CACHE_INVALIDATOR, STATUS_CACHE_POLL_INTERVAL_SECONDS)
+    )
+    rollup_task = asyncio.create_task(
+        arun_rollup_reconciler(ROLLUP_RECONCILE_INTERVAL_SECONDS, full_rebuild_interval=ROLLUP_FULL_REBUILD_SECONDS)
+    ) if COMPLAINT_ROLLUPS_ENABLED else None
+
+    if BOT_MODE == "webhook":
+        webhook_runner = await start_webhook_server(
+            application,
+            port=PORT,
+            secret_token=WEBHOOK_SECRET_TOKEN,
+            webhook_url=WEBHOOK_URL,
+            webhook_path=WEBHOOK_PATH,
+            health_callback=lambda: {"scheduler": scheduler.metrics()}
+        )
+    else:
+        await application.updater.start_polling(allowed_updates=Update.ALL_TYPES)
 
     try:
         await asyncio.Event().wait()
     finally:
+        metrics_task.cancel()
+        invalidator_task.cancel()
+        if rollup_task:
+            rollup_task.cancel()
+        await scheduler.stop()
+        await complaint_writer.stop() # flush whatever complaints are still waiting
+        if BOT_MODE == "webhook":
+            await webhook_runner.cleanup()
+        else:
+            await application.updater.stop()
         await application.stop()
+        close_clients()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
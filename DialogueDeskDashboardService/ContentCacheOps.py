@@ -0,0 +1,206 @@
+# others
+import os
+import json
+import zlib
+import hashlib
+import threading
+from datetime import datetime, timezone
+from typing import BinaryIO
+
+
+def hash_stream(file: BinaryIO, block_size: int = 1024 * 1024) -> str:
+    """sha256 of a file-like object, read block by block (the file is never loaded whole). Rewinds the file."""
+    digest = hashlib.sha256()
+    file.seek(0)
+    while block := file.read(block_size):
+        digest.update(block)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _encode(value) -> bytes:
+    return zlib.compress(json.dumps(value).encode("utf-8"))
+
+
+def _decode(data: bytes):
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+class DiskCacheBackend:
+    """
+    Content cache in a local directory, one zlib compressed json file per key.
+    Least recently used entries (by file mtime, refreshed on reads) are evicted once the directory exceeds max_bytes.
+    """
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sizes = None # file name -> size, scanned on first use
+
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json.z")
+
+
+    def _load_sizes(self):
+        if self._sizes is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._sizes = {
+                entry.name: entry.stat().st_size for entry in os.scandir(self.directory) if entry.name.endswith(".json.z")
+            }
+
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as entry:
+                value = _decode(entry.read())
+            os.utime(path) # mark as recently used
+            return value
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, zlib.error) as e:
+            print(f"Unreadable content cache entry {key}, ignoring: {e}")
+            return None
+
+
+    def set(self, key: str, value):
+        data = _encode(value)
+        with self._lock:
+            self._load_sizes()
+            path = self._path(key)
+            temp_path = f"{path}.tmp"
+            with open(temp_path, "wb") as entry:
+                entry.write(data)
+            os.replace(temp_path, path) # readers never see a half written entry
+            self._sizes[os.path.basename(path)] = len(data)
+            self._evict()
+
+
+    def _evict(self):
+        if sum(self._sizes.values()) <= self.max_bytes:
+            return
+        by_age = sorted(
+            self._sizes, key=lambda name: os.path.getmtime(os.path.join(self.directory, name))
+            if os.path.exists(os.path.join(self.directory, name)) else 0
+        )
+        total = sum(self._sizes.values())
+        for name in by_age[:-1]: # never evict the entry just written
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= self._sizes.pop(name)
+
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            self._load_sizes()
+            return sum(self._sizes.values())
+
+
+class MongoCacheBackend:
+    """
+    Content cache in a mongo collection, shared by every dashboard process. Values are stored zlib compressed,
+    with their size and last use; least recently used entries are deleted once the collection exceeds max_bytes.
+    get_collection is called on first use so the mongo client isn't built at import.
+    """
+    def __init__(self, get_collection, max_bytes: int = 512 * 1024 * 1024):
+        self.get_collection = get_collection
+        self.max_bytes = max_bytes
+        self._collection = None
+
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            self._collection = self.get_collection()
+            self._collection.create_index("last_used", name="last_used")
+        return self._collection
+
+
+    def get(self, key: str):
+        entry = self.collection.find_one_and_update(
+            {"_id": key}, {"$set": {"last_used": datetime.now(timezone.utc)}}, projection={"value": 1}
+        )
+        return _decode(entry["value"]) if entry else None
+
+
+    def set(self, key: str, value):
+        data = _encode(value)
+        self.collection.update_one(
+            {"_id": key},
+            {"$set": {"value": data, "size": len(data), "last_used": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+        self._evict(keep=key)
+
+
+    def _evict(self, keep: str):
+        total = self.size_bytes()
+        if total <= self.max_bytes:
+            return
+        for entry in self.collection.find({"_id": {"$ne": keep}}, {"size": 1}).sort("last_used", 1):
+            if total <= self.max_bytes:
+                break
+            self.collection.delete_one({"_id": entry["_id"]})
+            total -= entry.get("size", 0)
+
+
+    def size_bytes(self) -> int:
+        result = list(self.collection.aggregate([{"$group": {"_id": None, "total": {"$sum": "$size"}}}]))
+        return result[0]["total"] if result else 0
+
+
+class ContentCache:
+    """
+    Content addressed cache for expensive, deterministic results (whisper transcripts, LLM insights).
+    Keys are namespace + the hash of the input (+ anything that changes the output, e.g a prompt version),
+    so identical inputs are only ever paid for once.
+    """
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+
+    @staticmethod
+    def make_key(namespace: str, *parts: str) -> str:
+        return hashlib.sha256("|".join((namespace,) + parts).encode("utf-8")).hexdigest()
+
+
+    def get_or_compute(self, key: str, compute, should_cache=None):
+        """
+        Cached value for key, else compute() (stored unless should_cache(value) is False, e.g degraded results
+        that a retry should get another chance at). Exceptions from compute are never cached.
+        """
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            print(f"Content cache read failed: {e}")
+            value = None
+
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = compute()
+        if should_cache is not None and not should_cache(value):
+            return value
+        try:
+            self.backend.set(key, value)
+        except Exception as e:
+            print(f"Content cache write failed: {e}")
+        return value
+
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0}
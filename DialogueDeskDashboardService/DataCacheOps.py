@@ -0,0 +1,211 @@
+# others
+import time
+import threading
+from collections import OrderedDict
+from config import *
+from MongoDBOps import (
+    ComplaintsSync, meetings_metadata_by_date, search_by_date_and_id, complaint_counts_by_date_and_status,
+    search_meetings as db_search_meetings, build_meeting_search_index, get_meeting_transcript as db_get_meeting_transcript
+)
+
+
+class SharedDataCache:
+    """
+    Process wide cache shared by every dashboard session (streamlit reruns & browser tabs run in the same process).
+        - keys are namespaced and versioned; bump_version(namespace) invalidates every key in that namespace.
+        - entries expire after their ttl and the least recently used entry is evicted past max_entries.
+        - only one session loads a missing key at a time, the others wait and reuse the result.
+    Values are shared by reference, so callers must treat them as read-only.
+    """
+    def __init__(self, max_entries: int = 256, default_ttl: float = 300):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict() # key -> (value, expires_at)
+        self._versions = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+
+    def version(self, namespace: str) -> int:
+        return self._versions.get(namespace, 0)
+
+
+    def bump_version(self, namespace: str):
+        with self._lock:
+            self._versions[namespace] = self.version(namespace) + 1
+            for key in [key for key in self._entries if key[0] == namespace]:
+                del self._entries[key]
+
+
+    def get_or_load(self, namespace: str, key: tuple, loader, ttl: float = None):
+        full_key = (namespace, self.version(namespace)) + tuple(key)
+
+        value = self._get(full_key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(full_key, threading.Lock())
+        with key_lock:
+            value = self._get(full_key) # another session may have loaded it while we waited
+            if value is None:
+                value = loader()
+                self._set(full_key, value, self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            self._key_locks.pop(full_key, None)
+        return value
+
+
+    def _get(self, full_key):
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[full_key]
+                return None
+            self._entries.move_to_end(full_key)
+            return value
+
+
+    def _set(self, full_key, value, ttl: float):
+        with self._lock:
+            self._entries[full_key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+shared_cache = SharedDataCache(max_entries=DATA_CACHE_MAX_ENTRIES, default_ttl=DATA_CACHE_TTL_SECONDS)
+
+_complaints_sync = ComplaintsSync()
+_complaints_lock = threading.Lock()
+_complaints_synced_at = 0.0
+
+
+def get_complaints_data(force_refresh: bool = False):
+    """
+    Shared complaints frame. Synced incrementally at most every COMPLAINTS_REFRESH_SECONDS
+    (or straight away with force_refresh), by one session at a time.
+    """
+    global _complaints_synced_at
+    with _complaints_lock:
+        if force_refresh or time.monotonic() - _complaints_synced_at > COMPLAINTS_REFRESH_SECONDS:
+            _complaints_sync.refresh()
+            _complaints_synced_at = time.monotonic()
+        return _complaints_sync.dataframe()
+
+
+def complaints_data_version() -> int:
+    """Changes whenever the shared complaints frame changes, handy for keying derived data (charts, word cloud...)."""
+    return _complaints_sync.version
+
+
+def get_complaint_counts(force_refresh: bool = False):
+    """Shared per day/status complaint counts (see MongoDBOps.complaint_counts_by_date_and_status), reloaded every COMPLAINTS_REFRESH_SECONDS."""
+    if force_refresh:
+        shared_cache.bump_version("complaint_counts")
+    return shared_cache.get_or_load("complaint_counts", (), complaint_counts_by_date_and_status, ttl=COMPLAINTS_REFRESH_SECONDS)
+
+
+_ngram_counter = None
+_ngram_lock = threading.Lock()
+_ngram_version = -1
+
+
+def get_top_complaint_ngrams(top_k: int = 200, ngram_range: tuple = (3, 3)) -> dict:
+    """
+    Top n-gram frequencies over the shared complaints frame. Counts are updated incrementally
+    (only complaints not counted before are tokenized) and only when the frame's version changes.
+    """
+    global _ngram_counter, _ngram_version
+    with _ngram_lock:
+        if _ngram_counter is None:
+            from NgramOps import NgramCounter
+            _ngram_counter = NgramCounter(ngram_range=ngram_range)
+
+        if _ngram_version != complaints_data_version():
+            _ngram_version = complaints_data_version()
+            complaints_data = _complaints_sync.dataframe()
+            _ngram_counter.add_documents(dict(zip(complaints_data.index, complaints_data["complaint_text"])))
+        return _ngram_counter.top(top_k)
+
+
+def get_meetings_metadata(date: str) -> dict:
+    return shared_cache.get_or_load("meetings", ("metadata", date), lambda: meetings_metadata_by_date(date))
+
+
+def get_meeting_document(date: str, meeting_id: str) -> dict:
+    """Summary, key points & action items; the transcript is loaded separately with get_meeting_transcript."""
+    return shared_cache.get_or_load(
+        "meetings", ("document", date, str(meeting_id)),
+        lambda: search_by_date_and_id(f"{date}, {meeting_id}", include_transcript=False)
+    )
+
+
+def get_meeting_transcript(date: str, meeting_id: str) -> str:
+    return shared_cache.get_or_load(
+        "meetings", ("transcript", date, str(meeting_id)), lambda: db_get_meeting_transcript(date, str(meeting_id)) or ""
+    )
+
+
+_meeting_index_checked = False
+_meeting_index_lock = threading.Lock()
+
+
+def search_meetings(query: str, page: int = 1, page_size: int = 10):
+    """
+    Ranked search across all meetings (see MongoDBOps.search_meetings). The first search of the process
+    indexes any meeting missing from the index; results are shared and dropped when a meeting is uploaded.
+    """
+    global _meeting_index_checked
+    with _meeting_index_lock:
+        if not _meeting_index_checked:
+            added = build_meeting_search_index()
+            if added:
+                print(f"Indexed {added} meeting(s) for search.")
+            _meeting_index_checked = True
+
+    return shared_cache.get_or_load(
+        "meetings", ("search", query.strip().lower(), page, page_size), lambda: db_search_meetings(query, page, page_size)
+    )
+
+
+def invalidate_meetings():
+    """Call after upload_data so every session sees the new meeting."""
+    shared_cache.bump_version("meetings")
+
+
+_search_index = None
+_search_lock = threading.Lock()
+_search_version = -1
+
+
+def search_complaints(query: str, page: int = 1, page_size: int = 20):
+    """
+    Ranked (BM25) search over the shared complaints frame; see SearchOps.ComplaintSearchIndex for the query syntax.
+    The index is shared by every session and only complaints it has not seen yet are indexed when the frame changes.
+    Output:
+        (frame of the requested page's complaints with a "relevance" column, total number of matches)
+    """
+    global _search_index, _search_version
+    with _search_lock:
+        if _search_index is None:
+            from SearchOps import ComplaintSearchIndex
+            _search_index = ComplaintSearchIndex()
+
+        complaints_data = _complaints_sync.dataframe()
+        if _search_version != complaints_data_version():
+            _search_version = complaints_data_version()
+            for doc_id, text, topic_1, topic_2 in zip(
+                complaints_data.index, complaints_data["complaint_text"], complaints_data["topic_1"], complaints_data["topic_2"]
+            ):
+                if doc_id not in _search_index:
+                    _search_index.add(doc_id, text, (topic_1, topic_2))
+
+    hits, total = _search_index.search(query, page=page, page_size=page_size)
+    hit_ids = [doc_id for doc_id, _ in hits if doc_id in complaints_data.index]
+    results = complaints_data.loc[hit_ids].copy()
+    results["relevance"] = [score for doc_id, score in hits if doc_id in complaints_data.index]
+    return results, total
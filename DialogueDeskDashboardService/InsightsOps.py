@@ -0,0 +1,144 @@
+# others
+import re
+import json
+
+
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+")
+WORD_PATTERN = re.compile(r"\w+")
+
+_encoding = None
+
+
+def _get_encoding():
+    """gpt-3.5 tokenizer, loaded once. None if tiktoken (or its encoding file) isn't available."""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
+        except Exception as e:
+            print(f"tiktoken unavailable, estimating token counts: {e}")
+            _encoding = False
+    return _encoding or None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is None:
+        return int(len(text.split()) * 1.3) + 1 # ~1.3 tokens per english word
+    return len(encoding.encode(text))
+
+
+def _split_long_sentence(sentence: str, max_tokens: int) -> list:
+    """
+    Cuts a sentence longer than max_tokens at word boundaries. Keeps a running token count (each word is counted
+    with its leading space, the way the tokenizer sees it) instead of re-counting the piece for every word.
+    """
+    pieces, current, current_tokens = [], [], 0
+    for word in sentence.split():
+        tokens = count_tokens(f" {word}" if current else word)
+        if current and current_tokens + tokens > max_tokens:
+            pieces.append(" ".join(current))
+            current, tokens = [], count_tokens(word)
+        current.append(word)
+        current_tokens = tokens if len(current) == 1 else current_tokens + tokens
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def chunk_transcript(text: str, max_tokens: int = 3000, overlap_tokens: int = 200) -> list:
+    """
+    Splits a transcript into segments of at most max_tokens (gpt-3.5 tokens), cut at sentence boundaries.
+    Each segment repeats the last ~overlap_tokens of sentences of the previous one, so points spanning a cut aren't lost.
+    """
+    sentences = []
+    for sentence in SENTENCE_PATTERN.split(text.strip()):
+        if not sentence:
+            continue
+        tokens = count_tokens(sentence)
+        if tokens > max_tokens:
+            sentences += [(piece, count_tokens(piece)) for piece in _split_long_sentence(sentence, max_tokens)]
+        else:
+            sentences.append((sentence, tokens))
+
+    chunks, current, current_tokens = [], [], 0
+    for sentence, tokens in sentences:
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(" ".join(sentence for sentence, _ in current))
+            # carry the tail of this chunk over as the next one's overlap
+            overlap, overlap_size = [], 0
+            for previous in reversed(current):
+                if overlap_size + previous[1] > overlap_tokens or overlap_size + previous[1] + tokens > max_tokens:
+                    break
+                overlap.insert(0, previous)
+                overlap_size += previous[1]
+            current, current_tokens = overlap, overlap_size
+        current.append((sentence, tokens))
+        current_tokens += tokens
+
+    if current:
+        chunks.append(" ".join(sentence for sentence, _ in current))
+    return chunks
+
+
+def as_list(value) -> list:
+    """LLM list fields sometimes come back as a json/python list string or a bulleted string."""
+    if isinstance(value, list):
+        return [str(item).strip(" -*•\t") for item in value if str(item).strip(" -*•\t")]
+    if not value:
+        return []
+    value = str(value).strip()
+    try:
+        parsed = json.loads(value)
+        if isinstance(parsed, list):
+            return as_list(parsed)
+    except ValueError:
+        pass
+    return [line.strip(" -*•\t") for line in value.splitlines() if line.strip(" -*•\t")]
+
+
+def _words(text: str) -> set:
+    return set(WORD_PATTERN.findall(text.lower()))
+
+
+def dedupe_points(points: list, threshold: float = 0.7) -> list:
+    """
+    Removes repeated points (same words, or word jaccard similarity >= threshold with an earlier point),
+    keeping the first (longest when near duplicates differ) wording in original order.
+    """
+    kept = [] # (point, words)
+    for point in points:
+        words = _words(point)
+        if not words:
+            continue
+        for index, (kept_point, kept_words) in enumerate(kept):
+            if len(words & kept_words) / len(words | kept_words) >= threshold:
+                if len(point) > len(kept_point):
+                    kept[index] = (point, words | kept_words)
+                break
+        else:
+            kept.append((point, words))
+    return [point for point, _ in kept]
+
+
+def reduce_insights(chunk_insights: list, merge_summaries=None) -> dict:
+    """
+    Merges per chunk insights into one {"Summary", "key_points_discussed", "action_items"}.
+    merge_summaries(list of summaries) -> str combines the chunk summaries (e.g one small LLM call);
+    defaults to joining them.
+    """
+    chunk_insights = [insights for insights in chunk_insights if insights]
+    summaries = [str(insights.get("Summary", "")).strip() for insights in chunk_insights]
+    summaries = [summary for summary in summaries if summary]
+
+    if len(summaries) > 1 and merge_summaries is not None:
+        summary = merge_summaries(summaries)
+    else:
+        summary = " ".join(summaries)
+
+    return {
+        "Summary": summary or "No summary available",
+        "key_points_discussed": dedupe_points([point for insights in chunk_insights for point in as_list(insights.get("key_points_discussed"))]),
+        "action_items": dedupe_points([item for insights in chunk_insights for item in as_list(insights.get("action_items"))]),
+    }
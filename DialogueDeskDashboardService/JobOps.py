@@ -0,0 +1,254 @@
+# mongo db specific
+from pymongo import ASCENDING, ReturnDocument
+from bson.objectid import ObjectId
+from gridfs.errors import NoFile
+
+# others
+import os
+import uuid
+import threading
+import traceback
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Callable
+
+
+JOB_STATUSES = ("queued", "transcribing", "summarizing", "stored", "failed", "dead_letter")
+# "failed": gave up after max_attempts handled errors; "dead_letter": its worker kept dying (e.g crashed mid job)
+FINISHED_STATUSES = ("stored", "failed", "dead_letter")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class MeetingJobQueue:
+    """
+    Background processing of uploaded meeting recordings, so the dashboard never blocks on whisper/LLM calls.
+        - submit() streams the audio into a GridFS bucket and persists a job record (status "queued"); the page
+          returns immediately. The audio lives in the database, so any process sharing the collection can run the job.
+        - max_workers threads claim jobs with an atomic find_one_and_update and a lease, then run the stages:
+          transcribing -> summarizing -> stored. Each stage's output is saved on the job record before moving on.
+          While a job runs, a heartbeat renews its lease every lease_seconds / 3, so a long stage isn't claimed twice.
+        - a job whose worker died (lease expired, e.g the process crashed) is claimed again and resumes from its
+          last saved stage. Every claim counts as an attempt (incremented atomically in the claim), so after
+          max_attempts a job is marked "failed" (handled error) or "dead_letter" (worker died), and its audio is deleted.
+    Backends are injected so the queue can run against fake whisper/LLM/db functions:
+        transcribe(audio_file) -> str, summarize(transcript) -> dict, store(job) saves the meeting,
+        after_store(job) -> dict of stats (e.g notifications), optional. store and after_store must be safe to re-run
+        (a crash between storing and saving stored_at repeats the store) and must raise when they fail.
+    Several dashboard processes can share one collection; claims are atomic.
+    """
+    def __init__(
+        self, get_collection, get_audio_bucket, transcribe: Callable, summarize: Callable, store: Callable,
+        after_store: Callable = None, max_workers: int = 2, lease_seconds: float = 1800, max_attempts: int = 3, poll_interval: float = 2
+    ):
+        self.get_collection = get_collection # called lazily so the client isn't built at import
+        self.get_audio_bucket = get_audio_bucket # -> gridfs.GridFSBucket, also called lazily
+        self.transcribe = transcribe
+        self.summarize = summarize
+        self.store = store
+        self.after_store = after_store
+        self.max_workers = max_workers
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.worker_id = uuid.uuid4().hex[:8]
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._threads = []
+
+
+    def start(self):
+        self.get_collection().create_index([("status", ASCENDING), ("lease_until", ASCENDING)], name="status_lease")
+        self.get_collection().create_index([("created_at", ASCENDING)], name="created_at")
+        for index in range(self.max_workers):
+            thread = threading.Thread(target=self._work, name=f"meeting-job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+
+    def stop(self, timeout: float = None):
+        self._stopped.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+
+    def submit(self, audio_file: BinaryIO, file_name: str, meeting: dict) -> ObjectId:
+        """
+        Queues a recording. meeting holds the fields stored with the insights (Date, meeting_id).
+        Returns the job id.
+        """
+        job_id = ObjectId()
+        audio_file.seek(0)
+        # uploaded in GridFS chunks, not read into memory at once. Same id as the job.
+        self.get_audio_bucket().upload_from_stream_with_id(job_id, os.path.basename(file_name), audio_file)
+
+        self.get_collection().insert_one({
+            "_id": job_id,
+            "status": "queued",
+            "file_name": file_name,
+            "audio_file_id": job_id,
+            "meeting": meeting,
+            "attempts": 0,
+            "error": None,
+            "lease_until": None,
+            "created_at": _now(),
+            "updated_at": _now(),
+        })
+        self._wake.set()
+        return job_id
+
+
+    def get(self, job_id) -> dict:
+        return self.get_collection().find_one({"_id": ObjectId(str(job_id))}, {"transcript": 0, "insights": 0})
+
+
+    def list_jobs(self, limit: int = 10) -> list:
+        """Most recent jobs first, without their (large) transcript & insights."""
+        return list(self.get_collection().find({}, {"transcript": 0, "insights": 0}).sort("created_at", -1).limit(limit))
+
+
+    def _claim(self):
+        """Atomically takes the oldest unfinished job that no live worker holds and counts the attempt."""
+        now = _now()
+        return self.get_collection().find_one_and_update(
+            {
+                "status": {"$nin": list(FINISHED_STATUSES)},
+                "attempts": {"$lt": self.max_attempts},
+                "$or": [{"lease_until": None}, {"lease_until": {"$lt": now}}],
+            },
+            {
+                "$set": {"lease_until": now + timedelta(seconds=self.lease_seconds), "worker": self.worker_id, "updated_at": now},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("created_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+
+    def _dead_letter(self):
+        """Moves a job that used up its attempts without finishing (its worker died each time) to "dead_letter"."""
+        now = _now()
+        job = self.get_collection().find_one_and_update(
+            {
+                "status": {"$nin": list(FINISHED_STATUSES)},
+                "attempts": {"$gte": self.max_attempts},
+                "$or": [{"lease_until": None}, {"lease_until": {"$lt": now}}],
+            },
+            {"$set": {
+                "status": "dead_letter", "lease_until": None, "updated_at": now,
+                "error": f"worker stopped without finishing the job {self.max_attempts} times",
+            }},
+            return_document=ReturnDocument.AFTER
+        )
+        if job is not None:
+            print(f"Meeting job {job['_id']} moved to dead letter after {job['attempts']} attempts.")
+            self._delete_audio(job)
+        return job
+
+
+    def _delete_audio(self, job: dict):
+        try:
+            self.get_audio_bucket().delete(job["audio_file_id"])
+        except NoFile:
+            pass
+
+
+    def _update(self, job: dict, fields: dict, renew_lease: bool = True):
+        fields = {**fields, "updated_at": _now()}
+        if renew_lease:
+            fields["lease_until"] = _now() + timedelta(seconds=self.lease_seconds)
+        self.get_collection().update_one({"_id": job["_id"]}, {"$set": fields})
+        job.update(fields)
+
+
+    @contextmanager
+    def _heartbeat(self, job: dict):
+        """Renews the job's lease in the background while the block runs, as long as this worker still holds it."""
+        done = threading.Event()
+
+        def renew():
+            while not done.wait(self.lease_seconds / 3):
+                try:
+                    result = self.get_collection().update_one(
+                        {"_id": job["_id"], "worker": self.worker_id},
+                        {"$set": {"lease_until": _now() + timedelta(seconds=self.lease_seconds)}}
+                    )
+                    if result.matched_count == 0:
+                        print(f"Meeting job {job['_id']} lease was lost to another worker.")
+                        return
+                except Exception as e:
+                    print(f"Error renewing meeting job {job['_id']} lease: {e}")
+
+        thread = threading.Thread(target=renew, name=f"meeting-job-heartbeat-{job['_id']}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
+
+
+    def _work(self):
+        while not self._stopped.is_set():
+            try:
+                self._dead_letter()
+                job = self._claim()
+            except Exception as e:
+                print(f"Error claiming meeting job: {e}")
+                job = None
+
+            if job is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+
+            try:
+                self._process(job)
+            except Exception as e:
+                # e.g the db was unreachable while recording a failure; the lease expires and the job is retried
+                traceback.print_exc()
+                print(f"Meeting job worker error on job {job['_id']}, continuing: {e}")
+
+
+    def _process(self, job: dict):
+        with self._heartbeat(job):
+            self._run_stages(job)
+
+
+    def _run_stages(self, job: dict):
+        try:
+            if job.get("transcript") is None:
+                self._update(job, {"status": "transcribing"})
+                # GridOut is a seekable, named file object, read from the database as it is consumed
+                with self.get_audio_bucket().open_download_stream(job["audio_file_id"]) as audio_file:
+                    self._update(job, {"transcript": self.transcribe(audio_file)})
+
+            if job.get("insights") is None:
+                self._update(job, {"status": "summarizing"})
+                self._update(job, {"insights": self.summarize(job["transcript"])})
+
+            if job.get("stored_at") is None: # skipped on resume; store itself is an upsert if we crashed before this
+                self.store(job)
+                self._update(job, {"stored_at": _now()})
+
+            stats = self.after_store(job) if self.after_store else None
+            self._update(job, {"status": "stored", "result": stats, "error": None, "lease_until": None}, renew_lease=False)
+            self._delete_audio(job)
+
+        except Exception as e:
+            traceback.print_exc()
+            attempts = job.get("attempts", 1) # already counted by _claim
+            failed = attempts >= self.max_attempts
+            # retried (from the stage that failed) after a short backoff, held off by the lease
+            retry_at = None if failed else _now() + timedelta(seconds=self.poll_interval * 5 * attempts)
+            fields = {"error": str(e), "lease_until": retry_at}
+            if failed:
+                fields["status"] = "failed"
+            self._update(job, fields, renew_lease=False)
+            if failed:
+                self._delete_audio(job)
+            print(f"Meeting job {job['_id']} {'failed' if failed else 'will be retried'}: {e}")
@@ -6,9 +6,11 @@ from langchain.output_parsers import StructuredOutputParser, ResponseSchema
 from langchain.prompts import ChatPromptTemplate, SystemMessagePromptTemplate, HumanMessagePromptTemplate
 
 # others
-import io
 from config import *
 from MongoDBOps import *
+from NotificationOps import TelegramNotifier, RateLimiter, match_complaint_to_meeting
+from TranscriptionOps import iter_audio_chunks, transcribe_in_parallel, stitch_transcripts
+from InsightsOps import chunk_transcript, reduce_insights
 from typing import BinaryIO
 
 
@@ -16,51 +18,94 @@ from typing import BinaryIO
 import warnings
 warnings.filterwarnings('ignore')
 
-whisper_client = OpenAI(api_key=OPEN_AI_KEY)
+# clients are built once per process, on first use
+_whisper_client = None
+_insights_llm = None
+
+
+def get_whisper_client() -> OpenAI:
+    global _whisper_client
+    if _whisper_client is None:
+        _whisper_client = OpenAI(api_key=OPEN_AI_KEY, base_url=WHISPER_BASE_URL)
+    return _whisper_client
+
+
+def get_insights_llm() -> ChatOpenAI:
+    global _insights_llm
+    if _insights_llm is None:
+        _insights_llm = ChatOpenAI(model = "gpt-3.5-turbo", temperature = 0, max_tokens = 1000, openai_api_key = OPEN_AI_KEY)
+    return _insights_llm
 
 
 def audio_to_transcript(audio_file: BinaryIO) -> str:
-    def split_audio(file: BinaryIO, chunk_size: int = 25 * 1024 * 1024) -> list:
-        """
-        Splits a file-like object into chunks of the specified size (in bytes).
-        """
-        file.seek(0)  # Ensure we start reading from the beginning
-        chunks = []
-        while True:
-            chunk = file.read(chunk_size)
-            if not chunk:
-                break
-            chunk_io = io.BytesIO(chunk)
-            chunk_io.name = audio_file.name  # Retain original file name
-            chunks.append(chunk_io)
-        file.seek(0)  # Reset the pointer after splitting
-        return chunks
-
-    # Check the file size
-    audio_file.seek(0, 2)  # Move to the end of the file
-    file_size = audio_file.tell()
-    audio_file.seek(0)  # Reset pointer to the start
-
-    if file_size > 25 * 1024 * 1024:  # File exceeds 25 MB
-        chunks = split_audio(audio_file)
-        transcripts = []
-        for idx, chunk in enumerate(chunks):
-            print(f"Processing chunk {idx + 1} of {len(chunks)}...")
-            transcription = whisper_client.audio.transcriptions.create(
-                model="whisper-1", 
-                file=chunk
-            )
-            transcripts.append(transcription.text)
-        return " ".join(transcripts)
-    else:  # File is within size limit
-        transcription = whisper_client.audio.transcriptions.create(
-            model="whisper-1", 
-            file=audio_file
-        )
-        return transcription.text
-    
+    """
+    Streams the recording in chunks (wav: cut at quiet points with small overlaps, see TranscriptionOps.py),
+    transcribes them on a bounded pool of TRANSCRIBE_MAX_WORKERS, then stitches the texts back in order.
+    """
+    def transcribe(chunk) -> str:
+        return get_whisper_client().audio.transcriptions.create(model="whisper-1", file=chunk).text
+
+    chunks = iter_audio_chunks(audio_file, audio_file.name, TRANSCRIBE_CHUNK_SECONDS, TRANSCRIBE_OVERLAP_SECONDS)
+    transcripts = transcribe_in_parallel(chunks, transcribe, max_workers=TRANSCRIBE_MAX_WORKERS)
+    return stitch_transcripts(transcripts)
+
+
+# bump whenever the insights prompts/schema change, so cached insights from the old prompt aren't reused
+INSIGHTS_PROMPT_VERSION = "2"
+_content_cache = None
+
+
+def get_content_cache():
+    """Transcript & insights cache (CONTENT_CACHE_BACKEND), None when disabled."""
+    global _content_cache
+    if _content_cache is None and CONTENT_CACHE_BACKEND != "none":
+        from ContentCacheOps import ContentCache, DiskCacheBackend, MongoCacheBackend
+        max_bytes = int(CONTENT_CACHE_MAX_MB * 1024 * 1024)
+        if CONTENT_CACHE_BACKEND == "mongo":
+            _content_cache = ContentCache(MongoCacheBackend(content_cache_collection, max_bytes))
+        else:
+            _content_cache = ContentCache(DiskCacheBackend(CONTENT_CACHE_DIR, max_bytes))
+    return _content_cache
+
+
+def cached_audio_to_transcript(audio_file: BinaryIO) -> str:
+    """audio_to_transcript, reused for byte identical recordings (re-uploads, retried jobs)."""
+    content_cache = get_content_cache()
+    if content_cache is None:
+        return audio_to_transcript(audio_file)
+
+    from ContentCacheOps import hash_stream
+    key = content_cache.make_key("transcript", "whisper-1", hash_stream(audio_file))
+    return content_cache.get_or_compute(key, lambda: audio_to_transcript(audio_file))
+
+
+def cached_generate_transcript_insights(transcript: str) -> dict:
+    """generate_transcript_insights, reused for identical transcripts under the same prompt version & model."""
+    content_cache = get_content_cache()
+    if content_cache is None:
+        return generate_transcript_insights(transcript)
+
+    from ContentCacheOps import hash_text
+    key = content_cache.make_key(
+        "insights", INSIGHTS_PROMPT_VERSION, get_insights_llm().model_name, str(INSIGHTS_CHUNK_TOKENS), hash_text(transcript)
+    )
+    # partial insights (see generate_transcript_insights) aren't cached, a retry or re-upload tries again
+    return content_cache.get_or_compute(
+        key, lambda: generate_transcript_insights(transcript), should_cache=lambda insights: not insights.get("partial")
+    )
+
 
 def generate_transcript_insights(transcript: str) -> dict:
+    """
+    Map-reduce over the transcript so long meetings fit the context window:
+        map: the transcript is cut into overlapping ~INSIGHTS_CHUNK_TOKENS segments, each extracted concurrently
+             (INSIGHTS_MAX_WORKERS at a time), so latency follows the slowest segment rather than the transcript length.
+        reduce: key points & action items are de-duplicated locally, segment summaries merged with one small call.
+    Short transcripts are a single call, as before.
+    A segment that fails (LLM error or unparsable output) is retried up to INSIGHTS_SEGMENT_ATTEMPTS times; if any
+    segment still fails the whole call raises, so a meeting is never stored with part of its insights missing.
+    If only the summary merge fails, the part summaries are joined and the result is marked "partial": True.
+    """
     response_schemas = [
         ResponseSchema(name = "Summary", description = "A well-written string summary from the meetings transcript."),
         ResponseSchema(name = "key_points_discussed", description = "A python list [...] of key points discussed in the transcript."),
@@ -74,23 +119,57 @@ def generate_transcript_insights(transcript: str) -> dict:
 
     template = """
     Analyze the following transcript and extract insights. Format the insights as JSON:
-    Transcript: {input_transcript}
+    {segment_note}Transcript: {input_transcript}
 
     {format_instructions}
     """
     
     human_message = HumanMessagePromptTemplate.from_template(template)
     chat_prompt = ChatPromptTemplate.from_messages([system_message, human_message])
-    llm = ChatOpenAI(model = "gpt-3.5-turbo", temperature = 0, max_tokens = 1000, openai_api_key = OPEN_AI_KEY)
-    chain = chat_prompt | llm
-    
-    response = chain.invoke({
-        "input_transcript": transcript,
-        "format_instructions": output_parser.get_format_instructions()
-    })
-    
-    insights = output_parser.parse(response.content)
-    
+    # parsing is part of the chain so unparsable output is retried like an LLM error
+    chain = (chat_prompt | get_insights_llm() | output_parser).with_retry(stop_after_attempt=INSIGHTS_SEGMENT_ATTEMPTS)
+
+    segments = chunk_transcript(transcript, INSIGHTS_CHUNK_TOKENS, INSIGHTS_OVERLAP_TOKENS) or [transcript]
+    inputs = [
+        {
+            "segment_note": f"(This is part {index} of {len(segments)} of the meeting's transcript.)\n" if len(segments) > 1 else "",
+            "input_transcript": segment,
+            "format_instructions": output_parser.get_format_instructions()
+        }
+        for index, segment in enumerate(segments, 1)
+    ]
+
+    # map
+    segment_insights = chain.batch(inputs, config={"max_concurrency": INSIGHTS_MAX_WORKERS}, return_exceptions=True)
+    failed = [index for index, insights in enumerate(segment_insights, 1) if isinstance(insights, Exception)]
+    if failed:
+        raise RuntimeError(
+            f"Insights extraction failed for transcript part(s) {failed} of {len(segments)} "
+            f"after {INSIGHTS_SEGMENT_ATTEMPTS} attempts: {segment_insights[failed[0] - 1]}"
+        )
+
+    # reduce
+    summary_merged = True
+    def merge_summaries(summaries: list) -> str:
+        nonlocal summary_merged
+        try:
+            merge_prompt = ChatPromptTemplate.from_messages([
+                system_message,
+                HumanMessagePromptTemplate.from_template(
+                    "These are summaries of consecutive parts of one meeting. Combine them into one well-written "
+                    "summary of the whole meeting, without repeating points. Reply with the summary only.\n\n{summaries}"
+                )
+            ])
+            merge_chain = (merge_prompt | get_insights_llm()).with_retry(stop_after_attempt=INSIGHTS_SEGMENT_ATTEMPTS)
+            return merge_chain.invoke({"summaries": "\n\n".join(summaries)}).content.strip()
+        except Exception as e:
+            print(f"Summary merge failed, joining part summaries: {e}")
+            summary_merged = False
+            return " ".join(summaries)
+
+    insights = reduce_insights(segment_insights, merge_summaries)
+    if not summary_merged:
+        insights["partial"] = True
     return insights
 
 
@@ -204,6 +283,84 @@ class Agent():
             return "Oh ohh... Something seems to be wrong with my head, kindly ask admin to check up on me 🤧😷"
     
 
-def analyse_affected_users():
-    """Function checks all active complaints and messages users who's topics were brought up during just uploaded meeting."""
-    pass
\ No newline at end of file
+def analyse_affected_users(meeting_data: dict, notifier: TelegramNotifier = None) -> dict:
+    """
+    Function checks all active complaints and messages users who's topics were brought up during just uploaded meeting.
+    Each complaint is notified at most once per meeting. Input is the same dict passed to upload_data.
+    Output:
+        {"matched": *, "skipped_duplicates": *, "sent": *, "failed": *, "elapsed_seconds": *, "messages_per_second": *}
+    """
+    meeting_key = f"{meeting_data['Date']}|{meeting_data['meeting_id']}"
+    meeting_points = list(meeting_data.get("key_points", [])) + list(meeting_data.get("action_items", []))
+
+    messages = []
+    for complaint in complaints_to_notify():
+        matched_points = match_complaint_to_meeting(complaint, meeting_points)
+        if not matched_points:
+            continue
+
+        points = "\n".join(f"- {point}" for point in matched_points[:3])
+        messages.append({
+            "key": str(complaint["_id"]),
+            "chat_id": complaint["user_id"],
+            "text": (
+                f"Hi! There's an update on your report about {complaint.get('complaint_topic_1', 'your complaint')}. "
+                f"It was discussed in our meeting on {meeting_data['Date']}:\n{points}"
+            ),
+        })
+
+    notified = already_notified(meeting_key, [message["key"] for message in messages]) if messages else set()
+    pending_messages = [message for message in messages if message["key"] not in notified]
+
+    notifier = notifier or TelegramNotifier(
+        TELEGRAM_API_KEY,
+        api_base_url=TELEGRAM_API_BASE_URL,
+        max_workers=NOTIFY_MAX_WORKERS,
+        rate_limiter=RateLimiter(global_rate=NOTIFY_GLOBAL_RATE, per_chat_interval=NOTIFY_PER_CHAT_INTERVAL)
+    )
+    stats = notifier.send_all(pending_messages, on_sent=lambda keys: log_notifications(meeting_key, keys))
+    stats.update({"matched": len(messages), "skipped_duplicates": len(messages) - len(pending_messages)})
+    print(f"Notification fan-out for {meeting_key}: {stats}")
+    return stats
+
+# background meeting processing (see JobOps.py)
+# ===================================================================================================
+def meeting_data_from_job(job: dict) -> dict:
+    """The Meetings_Insights document (upload_data input) for a processed job."""
+    insights = job.get("insights") or {}
+    return {
+        "Date": job["meeting"]["Date"],
+        "meeting_id": job["meeting"]["meeting_id"],
+        "transcript": job["transcript"],
+        "ai_summary": insights.get("Summary", "No summary available"),
+        "key_points" : insights.get("key_points_discussed", []),
+        "action_items" : insights.get("action_items", [])
+    }
+
+
+def store_meeting_job(job: dict):
+    from DataCacheOps import invalidate_meetings
+    upload_data(meeting_data_from_job(job))
+    invalidate_meetings()
+
+
+def notify_meeting_job(job: dict) -> dict:
+    # already notified complaints are skipped, so a resumed job doesn't message anyone twice
+    return analyse_affected_users(meeting_data_from_job(job))
+
+
+def build_meeting_job_queue():
+    from JobOps import MeetingJobQueue
+    return MeetingJobQueue(
+        meeting_jobs_collection,
+        meeting_job_audio_bucket,
+        transcribe=cached_audio_to_transcript,
+        summarize=cached_generate_transcript_insights,
+        store=store_meeting_job,
+        after_store=notify_meeting_job,
+        max_workers=JOBS_MAX_WORKERS,
+        lease_seconds=JOBS_LEASE_SECONDS,
+        max_attempts=JOBS_MAX_ATTEMPTS,
+        poll_interval=JOBS_POLL_SECONDS
+    )
+# ===================================================================================================
@@ -0,0 +1,36 @@
+# others
+import heapq
+from collections import Counter
+
+
+class NgramCounter:
+    """
+    Incremental n-gram frequency counter for the complaints word cloud.
+    Counts live in a Counter keyed by n-gram (a persistent vocabulary, sparse by nature), so adding
+    new complaints only costs their own tokens; nothing is ever densified into a docs x vocabulary matrix.
+    Tokenization/stop words match the CountVectorizer previously used. When the vocabulary grows past
+    2 * max_vocab, it is pruned back to the max_vocab most frequent n-grams.
+    """
+    def __init__(self, ngram_range: tuple = (3, 3), stop_words: str = "english", max_vocab: int = 100000):
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        self.analyzer = CountVectorizer(ngram_range=ngram_range, stop_words=stop_words).build_analyzer()
+        self.max_vocab = max_vocab
+        self.counts = Counter()
+        self.seen_ids = set()
+
+
+    def add_documents(self, documents: dict):
+        """documents: {doc_id: text}. Documents already counted are skipped."""
+        for doc_id, text in documents.items():
+            if doc_id in self.seen_ids:
+                continue
+            self.seen_ids.add(doc_id)
+            self.counts.update(self.analyzer(str(text)))
+
+        if len(self.counts) > 2 * self.max_vocab:
+            self.counts = Counter(dict(self.counts.most_common(self.max_vocab)))
+
+
+    def top(self, k: int = 200) -> dict:
+        return dict(heapq.nlargest(k, self.counts.items(), key=lambda item: item[1]))
@@ -0,0 +1,197 @@
+# others
+import re
+import time
+import random
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+
+
+STOPWORDS = {
+    "the", "and", "for", "with", "from", "that", "this", "are", "was", "were", "has", "have", "had", "not",
+    "but", "all", "any", "can", "our", "your", "their", "its", "into", "about", "issue", "issues", "problem",
+    "problems", "complaint", "complaints", "other", "none", "n/a",
+}
+
+
+def _tokens(text: str) -> set:
+    """Lowercased words (3+ letters, no stopwords) with a trailing plural "s" removed."""
+    words = re.findall(r"[a-z]{3,}", str(text).lower())
+    return {word[:-1] if word.endswith("s") and len(word) > 3 else word for word in words if word not in STOPWORDS}
+
+
+def match_complaint_to_meeting(complaint: dict, meeting_points: list) -> list:
+    """
+    Returns the meeting points (key points/action items) relevant to a complaint's topics.
+    A topic matches a point if at least half of the topic's words appear in it.
+    """
+    topic_tokens = [
+        _tokens(complaint.get(topic, "")) for topic in ("complaint_topic_1", "complaint_topic_2")
+    ]
+    topic_tokens = [tokens for tokens in topic_tokens if tokens]
+
+    matched_points = []
+    for point in meeting_points:
+        point_tokens = _tokens(point)
+        if any(len(tokens & point_tokens) * 2 >= len(tokens) for tokens in topic_tokens):
+            matched_points.append(point)
+    return matched_points
+
+
+class RateLimiter:
+    """
+    Thread safe limiter for Telegram's limits: max global_rate messages/sec overall (token bucket)
+    and at most one message every per_chat_interval seconds to the same chat.
+    """
+    def __init__(self, global_rate: float = 30, per_chat_interval: float = 1.0):
+        self.global_rate = global_rate
+        self.per_chat_interval = per_chat_interval
+        self._tokens = global_rate
+        self._last_refill = time.monotonic()
+        self._chat_next_send = {}
+        self._lock = threading.Lock()
+
+
+    def acquire(self, chat_id):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.global_rate, self._tokens + (now - self._last_refill) * self.global_rate)
+                self._last_refill = now
+
+                chat_wait = self._chat_next_send.get(chat_id, 0) - now
+                global_wait = (1 - self._tokens) / self.global_rate if self._tokens < 1 else 0
+                if chat_wait <= 0 and global_wait <= 0:
+                    self._tokens -= 1
+                    self._chat_next_send[chat_id] = now + self.per_chat_interval
+                    return
+                wait = max(chat_wait, global_wait)
+            time.sleep(wait)
+
+
+class TelegramNotifier:
+    """
+    Outbound Telegram message queue. Messages are sent in batches by a bounded thread pool,
+    respecting the rate limiter, and retried with exponential backoff (or Telegram's retry_after on 429s).
+    Each worker thread gets its own requests.Session (Session isn't thread safe), keeping one connection alive.
+    api_base_url can point at a local fake Telegram endpoint for testing (see benchmark below).
+    """
+    def __init__(self, bot_token: str, api_base_url: str = "https://api.telegram.org", max_workers: int = 8,
+                 batch_size: int = 30, max_retries: int = 4, rate_limiter: RateLimiter = None):
+        self.send_url = f"{api_base_url.rstrip('/')}/bot{bot_token}/sendMessage"
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self._local = threading.local()
+
+
+    @property
+    def session(self) -> requests.Session:
+        """The calling thread's session, created on first use."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount(self.send_url, HTTPAdapter(pool_connections=1, pool_maxsize=1))
+            self._local.session = session
+        return session
+
+
+    def send(self, chat_id, text: str) -> bool:
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire(chat_id)
+            try:
+                response = self.session.post(self.send_url, json={"chat_id": chat_id, "text": text}, timeout=10)
+                if response.status_code == 200:
+                    return True
+                if response.status_code == 429:
+                    retry_after = response.json().get("parameters", {}).get("retry_after", 2 ** attempt)
+                    time.sleep(retry_after)
+                    continue
+                if response.status_code < 500:
+                    # bad request / bot blocked by the user etc, retrying won't help
+                    print(f"ERROR sending notification to {chat_id}: {response.status_code} {response.text}")
+                    return False
+            except requests.RequestException as e:
+                print(f"ERROR sending notification to {chat_id} (attempt {attempt + 1}): {e}")
+            time.sleep(min(30, 2 ** attempt) + random.random())
+        return False
+
+
+    def send_all(self, messages: list, on_sent=None) -> dict:
+        """
+        messages: [{"key": ..., "chat_id": ..., "text": ...}, ...]
+        on_sent(keys) is called after each batch with the keys of the messages that were delivered.
+        Returns delivery stats including throughput in messages/sec.
+        """
+        started = time.monotonic()
+        sent, failed = 0, 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for start in range(0, len(messages), self.batch_size):
+                batch = messages[start:start + self.batch_size]
+                results = list(executor.map(lambda message: self.send(message["chat_id"], message["text"]), batch))
+
+                delivered = [message["key"] for message, ok in zip(batch, results) if ok]
+                sent += len(delivered)
+                failed += len(batch) - len(delivered)
+                if on_sent and delivered:
+                    on_sent(delivered)
+
+        elapsed = time.monotonic() - started
+        return {
+            "sent": sent,
+            "failed": failed,
+            "elapsed_seconds": round(elapsed, 3),
+            "messages_per_second": round(sent / elapsed, 2) if elapsed else 0.0,
+        }
+
+
+def benchmark(messages: int = 200, latency: float = 0.05, workers=(1, 8)) -> dict:
+    """
+    Delivery throughput against a local fake Telegram endpoint that answers every sendMessage after latency seconds,
+    for each number of worker threads (rate limits are lifted so only the sending is measured).
+    Run: python NotificationOps.py
+    """
+    import json
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    class FakeTelegram(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" # keep-alive, so sessions reuse their connection
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latency)
+            body = json.dumps({"ok": True}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeTelegram)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    report = {}
+    try:
+        batch = [{"key": i, "chat_id": i, "text": "update"} for i in range(messages)]
+        for max_workers in workers:
+            notifier = TelegramNotifier(
+                "TOKEN", api_base_url=f"http://127.0.0.1:{server.server_port}", max_workers=max_workers,
+                rate_limiter=RateLimiter(global_rate=1e9, per_chat_interval=0)
+            )
+            report[max_workers] = notifier.send_all(batch)
+            print(f"{max_workers} worker(s): {report[max_workers]}")
+    finally:
+        server.shutdown()
+        server.server_close()
+    return report
+
+
+if __name__ == "__main__":
+    report = benchmark()
+    assert all(stats["failed"] == 0 for stats in report.values()), "notifications failed against the fake endpoint"
+    assert report[8]["messages_per_second"] > 3 * report[1]["messages_per_second"], "no concurrency gain with 8 workers"
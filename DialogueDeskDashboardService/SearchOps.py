@@ -0,0 +1,371 @@
+# others
+import re
+import html
+import math
+import time
+import heapq
+import threading
+from collections import defaultdict
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+PHRASE_PATTERN = re.compile(r'"([^"]+)"')
+
+
+def tokenize(text: str) -> list:
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+def parse_query(query: str):
+    """
+    'water "no supply" lagos' -> terms ["water", "lagos"], phrases [["no", "supply"]]
+    Every term and phrase must match (AND).
+    """
+    phrases = [tokenize(phrase) for phrase in PHRASE_PATTERN.findall(query)]
+    terms = tokenize(PHRASE_PATTERN.sub(" ", query))
+    return terms, [phrase for phrase in phrases if phrase]
+
+
+class ComplaintSearchIndex:
+    """
+    In-process positional inverted index over complaint text and topics, ranked with BM25.
+        - add() is incremental, so the index follows the shared complaints frame as it syncs.
+        - queries are AND over terms, with "quoted phrases" matched by position.
+        - search() returns one page of (doc_id, score) plus the total number of hits.
+    """
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(dict) # term -> {doc: [positions]}
+        self.doc_lengths = {} # doc -> number of tokens
+        self.doc_ids = [] # doc (int) -> external id
+        self._doc_numbers = {} # external id -> doc (int)
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+
+    def add(self, doc_id, text: str, topics: tuple = ()):
+        """Indexes a complaint (topics are indexed as extra tokens after the text). Re-adding a doc replaces it."""
+        tokens = tokenize(text)
+        for topic in topics:
+            tokens += tokenize(topic)
+
+        with self._lock:
+            if doc_id in self._doc_numbers:
+                self._remove(self._doc_numbers[doc_id])
+                doc = self._doc_numbers[doc_id]
+            else:
+                doc = len(self.doc_ids)
+                self.doc_ids.append(doc_id)
+                self._doc_numbers[doc_id] = doc
+
+            positions = defaultdict(list)
+            for position, token in enumerate(tokens):
+                positions[token].append(position)
+            for token, token_positions in positions.items():
+                self.postings[token][doc] = token_positions
+
+            self.doc_lengths[doc] = len(tokens)
+            self._total_length += len(tokens)
+
+
+    def _remove(self, doc: int):
+        self._total_length -= self.doc_lengths.pop(doc, 0)
+        for term in [term for term, docs in self.postings.items() if doc in docs]:
+            del self.postings[term][doc]
+
+
+    def __contains__(self, doc_id):
+        return doc_id in self._doc_numbers
+
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+
+    def _phrase_matches(self, doc: int, phrase: list) -> bool:
+        first_positions = self.postings[phrase[0]][doc]
+        later_positions = [set(self.postings[term][doc]) for term in phrase[1:]]
+        return any(
+            all(start + offset + 1 in positions for offset, positions in enumerate(later_positions))
+            for start in first_positions
+        )
+
+
+    def search(self, query: str, page: int = 1, page_size: int = 20):
+        """
+        Output:
+            ([(doc_id, score), ...] for the requested page, total number of matching docs)
+        """
+        terms, phrases = parse_query(query)
+        query_terms = set(terms) | {term for phrase in phrases for term in phrase}
+        if not query_terms:
+            return [], 0
+
+        with self._lock:
+            if any(term not in self.postings or not self.postings[term] for term in query_terms):
+                return [], 0
+
+            # AND: intersect starting from the rarest term
+            ordered_terms = sorted(query_terms, key=lambda term: len(self.postings[term]))
+            candidates = set(self.postings[ordered_terms[0]])
+            for term in ordered_terms[1:]:
+                candidates.intersection_update(self.postings[term])
+                if not candidates:
+                    return [], 0
+
+            if phrases:
+                candidates = {doc for doc in candidates if all(self._phrase_matches(doc, phrase) for phrase in phrases)}
+
+            n_docs = len(self.doc_lengths)
+            avg_length = self._total_length / n_docs if n_docs else 0
+            idf = {
+                term: math.log(1 + (n_docs - len(self.postings[term]) + 0.5) / (len(self.postings[term]) + 0.5))
+                for term in query_terms
+            }
+
+            def bm25(doc: int) -> float:
+                length_norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc] / avg_length) if avg_length else self.k1
+                score = 0.0
+                for term in query_terms:
+                    tf = len(self.postings[term][doc])
+                    score += idf[term] * tf * (self.k1 + 1) / (tf + length_norm)
+                return score
+
+            top = heapq.nlargest(page * page_size, ((bm25(doc), doc) for doc in candidates))
+            page_hits = top[(page - 1) * page_size:]
+            return [(self.doc_ids[doc], round(score, 4)) for score, doc in page_hits], len(candidates)
+
+
+def highlight_pattern(terms: list, whole_words: bool = True):
+    """One compiled, case insensitive pattern matching any of the terms (longest first)."""
+    terms = sorted({term for term in terms if term}, key=len, reverse=True)
+    if not terms:
+        return None
+    alternatives = "|".join(re.escape(term) for term in terms)
+    return re.compile(rf"\b(?:{alternatives})\b" if whole_words else f"(?:{alternatives})", re.IGNORECASE)
+
+
+def highlight_html(text: str, pattern) -> tuple:
+    """
+    Html escapes text and wraps pattern matches in <span class="highlight">, in a single pass.
+    Returns tuple of (highlighted_html, match_count).
+    """
+    if pattern is None:
+        return html.escape(text), 0
+
+    parts, last_end, match_count = [], 0, 0
+    for match in pattern.finditer(text):
+        parts.append(html.escape(text[last_end:match.start()]))
+        parts.append(f'<span class="highlight">{html.escape(match.group(0))}</span>')
+        last_end = match.end()
+        match_count += 1
+    parts.append(html.escape(text[last_end:]))
+    return "".join(parts), match_count
+
+
+def make_snippet(text: str, position: int, pattern=None, window: int = 20) -> str:
+    """Highlighted html snippet of the tokens around token position (as indexed by tokenize)."""
+    start_char, end_char = None, len(text)
+    for index, match in enumerate(TOKEN_PATTERN.finditer(text)):
+        if index == position - window:
+            start_char = match.start()
+        if index == position + window:
+            end_char = match.end()
+            break
+    start_char = start_char or 0
+
+    snippet, _ = highlight_html(text[start_char:end_char], pattern)
+    return ("... " if start_char else "") + snippet + (" ..." if end_char < len(text) else "")
+
+
+def paginate_text(text: str, page_chars: int = 4000) -> list:
+    """Splits long text into [(start, end), ...] pages of about page_chars, cut at whitespace."""
+    pages, start = [], 0
+    while start < len(text):
+        end = min(start + page_chars, len(text))
+        if end < len(text):
+            cut = max(text.rfind("\n", start, end), text.rfind(" ", start, end))
+            end = cut + 1 if cut > start else end
+        pages.append((start, end))
+        start = end
+    return pages or [(0, 0)]
+
+
+class MeetingSearchIndex:
+    """
+    Positional inverted index over meeting transcripts & ai summaries, persisted in mongo so it survives restarts
+    and is shared by every dashboard process. Meetings are indexed as they are uploaded (see MongoDBOps.upload_data).
+        - postings collection: one document per (term, meeting, field) -> token positions, indexed on term.
+        - docs collection: token length of every (meeting, field), plus per field totals for BM25's average length.
+    A query only reads the postings of its own terms. Terms (and "quoted phrases") must all match within one field;
+    a meeting's score is the field weighted sum of its matching fields' BM25 scores.
+    """
+    FIELD_WEIGHTS = {"ai_summary": 2.0, "transcript": 1.0}
+
+    def __init__(self, get_postings_collection, get_docs_collection, k1: float = 1.5, b: float = 0.75):
+        self.get_postings_collection = get_postings_collection # called lazily so clients aren't built at import
+        self.get_docs_collection = get_docs_collection
+        self.k1 = k1
+        self.b = b
+
+
+    def ensure_indexes(self):
+        self.get_postings_collection().create_index("term", name="term")
+        self.get_postings_collection().create_index("meeting_key", name="meeting_key")
+        self.get_docs_collection().create_index("meeting_key", name="meeting_key")
+
+
+    def indexed_meetings(self) -> set:
+        return set(self.get_docs_collection().distinct("meeting_key"))
+
+
+    def add(self, meeting_key: str, fields: dict, metadata: dict = None):
+        """
+        Indexes (or re-indexes) a meeting.
+        Input:
+            fields: {"transcript": ..., "ai_summary": ...}, metadata: stored with the meeting, returned with hits (date, meeting_id...)
+        """
+        self.remove(meeting_key)
+        postings, docs = [], []
+        for field, text in fields.items():
+            positions = defaultdict(list)
+            tokens = tokenize(text or "")
+            for position, token in enumerate(tokens):
+                positions[token].append(position)
+
+            postings += [
+                {"_id": f"{term}|{meeting_key}|{field}", "term": term, "meeting_key": meeting_key, "field": field, "positions": term_positions}
+                for term, term_positions in positions.items()
+            ]
+            docs.append({"_id": f"{meeting_key}|{field}", "meeting_key": meeting_key, "field": field, "length": len(tokens), **(metadata or {})})
+
+        if postings:
+            self.get_postings_collection().insert_many(postings, ordered=False)
+        self.get_docs_collection().insert_many(docs, ordered=False)
+        for doc in docs:
+            self.get_docs_collection().update_one(
+                {"_id": f"__stats__|{doc['field']}"}, {"$inc": {"docs": 1, "total_length": doc["length"]}}, upsert=True
+            )
+
+
+    def remove(self, meeting_key: str):
+        for doc in self.get_docs_collection().find({"meeting_key": meeting_key}, {"field": 1, "length": 1}):
+            self.get_docs_collection().update_one(
+                {"_id": f"__stats__|{doc['field']}"}, {"$inc": {"docs": -1, "total_length": -doc["length"]}}
+            )
+        self.get_docs_collection().delete_many({"meeting_key": meeting_key})
+        self.get_postings_collection().delete_many({"meeting_key": meeting_key})
+
+
+    def search(self, query: str, page: int = 1, page_size: int = 10):
+        """
+        Output:
+            ([{"meeting_key": ..., "score": ..., "field": best matching field, "position": first match in that field,
+               "terms": query terms, **metadata}, ...] for the requested page, total number of matching meetings)
+        """
+        terms, phrases = parse_query(query)
+        query_terms = set(terms) | {term for phrase in phrases for term in phrase}
+        if not query_terms:
+            return [], 0
+
+        # (meeting_key, field) -> {term: positions}, for the query terms only
+        matches = defaultdict(dict)
+        document_frequency = defaultdict(int) # (term, field) -> number of docs
+        for posting in self.get_postings_collection().find(
+            {"term": {"$in": list(query_terms)}}, {"term": 1, "meeting_key": 1, "field": 1, "positions": 1}
+        ):
+            matches[(posting["meeting_key"], posting["field"])][posting["term"]] = posting["positions"]
+            document_frequency[(posting["term"], posting["field"])] += 1
+
+        candidates = {doc: positions for doc, positions in matches.items() if len(positions) == len(query_terms)}
+        for phrase in phrases:
+            candidates = {doc: positions for doc, positions in candidates.items() if self._phrase_position(positions, phrase) is not None}
+        if not candidates:
+            return [], 0
+
+        stats = {
+            stat["_id"].split("|", 1)[1]: stat
+            for stat in self.get_docs_collection().find({"_id": {"$regex": "^__stats__\\|"}})
+        }
+        docs = {
+            (doc["meeting_key"], doc["field"]): doc
+            for doc in self.get_docs_collection().find({"_id": {"$in": [f"{key}|{field}" for key, field in candidates]}})
+        }
+
+        meetings = {}
+        for (meeting_key, field), positions in candidates.items():
+            field_stats = stats.get(field, {})
+            n_docs = max(field_stats.get("docs", 0), 1)
+            avg_length = field_stats.get("total_length", 0) / n_docs or 1
+            doc = docs.get((meeting_key, field), {})
+            length_norm = self.k1 * (1 - self.b + self.b * doc.get("length", avg_length) / avg_length)
+
+            score = 0.0
+            for term, term_positions in positions.items():
+                df = document_frequency[(term, field)]
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                score += idf * len(term_positions) * (self.k1 + 1) / (len(term_positions) + length_norm)
+            score *= self.FIELD_WEIGHTS.get(field, 1.0)
+
+            position = self._phrase_position(positions, phrases[0]) if phrases else min(min(p) for p in positions.values())
+            meeting = meetings.setdefault(meeting_key, {"meeting_key": meeting_key, "score": 0.0, "best_field_score": -1})
+            meeting["score"] += score
+            if score > meeting["best_field_score"]:
+                metadata = {key: value for key, value in doc.items() if key not in ("_id", "meeting_key", "field", "length")}
+                meeting.update(metadata, best_field_score=score, field=field, position=position)
+
+        ranked = sorted(meetings.values(), key=lambda meeting: meeting["score"], reverse=True)
+        page_hits = ranked[(page - 1) * page_size:page * page_size]
+        for meeting in page_hits:
+            meeting.pop("best_field_score")
+            meeting["score"] = round(meeting["score"], 4)
+            meeting["terms"] = sorted(query_terms)
+        return page_hits, len(ranked)
+
+
+    @staticmethod
+    def _phrase_position(positions: dict, phrase: list):
+        """First position where phrase occurs, given {term: positions}; None if it doesn't."""
+        later_positions = [set(positions[term]) for term in phrase[1:]]
+        for start in positions[phrase[0]]:
+            if all(start + offset + 1 in term_positions for offset, term_positions in enumerate(later_positions)):
+                return start
+        return None
+
+
+def benchmark(sizes=(10_000, 100_000, 1_000_000), queries=("internet outage", '"no water" lagos', "billing")):
+    """
+    Rough latency report for the search index at different collection sizes, on synthetic complaints.
+    Run: python SearchOps.py
+    """
+    import random
+
+    vocabulary = [
+        "internet", "outage", "water", "supply", "lagos", "abuja", "billing", "meter", "power", "network",
+        "support", "delay", "refund", "charge", "service", "slow", "broken", "no", "days", "week",
+    ] + [f"word{i}" for i in range(5000)]
+    generator = random.Random(1)
+    report = {}
+
+    index = ComplaintSearchIndex()
+    for size in sizes:
+        started = time.perf_counter()
+        for doc_id in range(len(index), size):
+            words = generator.choices(vocabulary[:20], k=4) + generator.choices(vocabulary, k=12)
+            index.add(doc_id, " ".join(words), ("topic", generator.choice(vocabulary[:20])))
+        build_seconds = time.perf_counter() - started
+
+        latencies = {}
+        for query in queries:
+            started = time.perf_counter()
+            for _ in range(5):
+                results, total = index.search(query, page=1, page_size=20)
+            latencies[query] = {"ms": round((time.perf_counter() - started) / 5 * 1000, 2), "hits": total}
+        report[size] = {"incremental_build_seconds": round(build_seconds, 2), "queries": latencies}
+        print(size, report[size])
+    return report
+
+
+if __name__ == "__main__":
+    benchmark()
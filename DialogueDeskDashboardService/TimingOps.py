@@ -0,0 +1,40 @@
+# others
+import time
+
+
+# set once, when the module is first imported by the process (i.e the first streamlit run)
+PROCESS_STARTED = time.perf_counter()
+_first_run_reported = False
+
+
+class RerunTimer:
+    """
+    Times a streamlit (re)run section by section so startup/rerun regressions are visible.
+    Usage:
+        timer = RerunTimer()
+        ... timer.mark("kpis") ... timer.mark("charts") ...
+        timer.report()
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.sections = []
+
+
+    def mark(self, section: str):
+        now = time.perf_counter()
+        self.sections.append((section, now - self._last))
+        self._last = now
+
+
+    def report(self) -> dict:
+        """Prints and returns the section timings (milliseconds). The first run of the process also reports startup time."""
+        global _first_run_reported
+        report = {section: round(seconds * 1000, 1) for section, seconds in self.sections}
+        report["total"] = round((time.perf_counter() - self.started) * 1000, 1)
+
+        if not _first_run_reported:
+            report["process_startup"] = round((time.perf_counter() - PROCESS_STARTED) * 1000, 1)
+            _first_run_reported = True
+        print(f"Dashboard run timings (ms): {report}")
+        return report
@@ -0,0 +1,226 @@
+# others
+import io
+import re
+import time
+import wave
+import numpy as np
+from typing import BinaryIO, Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+
+WHISPER_MAX_BYTES = 25 * 1024 * 1024
+
+
+def _named_chunk(data: bytes, name: str) -> io.BytesIO:
+    chunk = io.BytesIO(data)
+    chunk.name = name # whisper guesses the format from the file name
+    return chunk
+
+
+def iter_byte_chunks(file: BinaryIO, name: str, chunk_size: int = WHISPER_MAX_BYTES - 1024 * 1024) -> Iterator[io.BytesIO]:
+    """Streams a file in chunk_size byte chunks, only one chunk in memory at a time (formats we can't parse locally)."""
+    file.seek(0)
+    while True:
+        data = file.read(chunk_size)
+        if not data:
+            break
+        yield _named_chunk(data, name)
+
+
+def _quietest_frame(frames: bytes, sample_width: int, channels: int, frame_rate: int, window_seconds: float = 0.02) -> int:
+    """Index (in frames) of the start of the quietest window_seconds window in frames; used as the cut point."""
+    if sample_width not in (1, 2, 4):
+        return len(frames) // (sample_width * channels)
+    dtype = {1: np.uint8, 2: np.int16, 4: np.int32}[sample_width]
+    samples = np.frombuffer(frames, dtype=dtype).astype(np.float64)
+    if sample_width == 1:
+        samples -= 128 # 8 bit wav is unsigned
+    samples = samples.reshape(-1, channels).mean(axis=1)
+
+    window = max(1, int(frame_rate * window_seconds))
+    n_windows = len(samples) // window
+    if n_windows == 0:
+        return len(samples)
+    energy = np.sqrt(np.mean(samples[:n_windows * window].reshape(n_windows, window) ** 2, axis=1))
+    return int(np.argmin(energy)) * window
+
+
+def iter_wav_chunks(
+    file: BinaryIO, name: str, chunk_seconds: float = 120, overlap_seconds: float = 1.5,
+    search_seconds: float = 3, max_chunk_bytes: int = WHISPER_MAX_BYTES - 1024 * 1024
+) -> Iterator[io.BytesIO]:
+    """
+    Streams a wav file as standalone wav chunks of about chunk_seconds.
+        - each chunk is cut at the quietest point of its last search_seconds, so words aren't split at the boundary.
+        - each chunk starts overlap_seconds before the previous cut; the repeated words are dropped by stitch_transcripts.
+    Only the current chunk (plus the search window) is held in memory.
+    """
+    file.seek(0)
+    with wave.open(file, "rb") as source:
+        params = source.getparams()
+        frame_size = params.sampwidth * params.nchannels
+        frames_per_chunk = min(int(chunk_seconds * params.framerate), max_chunk_bytes // frame_size)
+        search_frames = min(int(search_seconds * params.framerate), frames_per_chunk // 2)
+        overlap_frames = min(int(overlap_seconds * params.framerate), frames_per_chunk // 4)
+
+        carry = b"" # overlap + leftover after the last cut, prepended to the next chunk
+        while True:
+            frames = carry + source.readframes(frames_per_chunk - len(carry) // frame_size)
+            if not frames:
+                break
+
+            is_last = source.tell() >= source.getnframes()
+            if is_last:
+                cut = len(frames) // frame_size
+            else:
+                search_start = len(frames) - search_frames * frame_size
+                cut = search_start // frame_size + _quietest_frame(
+                    frames[search_start:], params.sampwidth, params.nchannels, params.framerate
+                )
+
+            output = io.BytesIO()
+            with wave.open(output, "wb") as chunk:
+                chunk.setparams(params)
+                chunk.writeframes(frames[:cut * frame_size])
+            yield _named_chunk(output.getvalue(), name)
+
+            if is_last:
+                break
+            carry = frames[max(0, cut - overlap_frames) * frame_size:]
+
+
+def iter_audio_chunks(file: BinaryIO, name: str, chunk_seconds: float = 120, overlap_seconds: float = 1.5) -> Iterator[io.BytesIO]:
+    """
+    Wav files are split at quiet points with small overlaps (see iter_wav_chunks); other formats are
+    only split (in plain byte chunks, as before) when they exceed whisper's 25 MB limit.
+    """
+    if name.lower().endswith(".wav"):
+        try:
+            yield from iter_wav_chunks(file, name, chunk_seconds, overlap_seconds)
+            return
+        except (wave.Error, EOFError) as e:
+            print(f"Could not parse {name} as wav, splitting by bytes: {e}")
+
+    file.seek(0, 2)
+    size = file.tell()
+    file.seek(0)
+    if size <= WHISPER_MAX_BYTES:
+        yield _named_chunk(file.read(), name)
+    else:
+        yield from iter_byte_chunks(file, name)
+
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def _normalize_words(text: str) -> list:
+    return [word.lower() for word in _WORD_PATTERN.findall(text)]
+
+
+def stitch_transcripts(texts: list, max_overlap_words: int = 30, min_overlap_words: int = 2) -> str:
+    """
+    Joins chunk transcripts in order, dropping the words a chunk repeats from the end of the previous one
+    (overlapping audio). The longest suffix/prefix match of up to max_overlap_words (case & punctuation insensitive) is removed.
+    """
+    stitched = []
+    previous_words = []
+    for text in texts:
+        text = (text or "").strip()
+        if not text:
+            continue
+        words = text.split()
+        normalized = [_normalize_words(word) for word in words]
+        flat_words = [token for tokens in normalized for token in tokens]
+
+        overlap = 0
+        for size in range(min(max_overlap_words, len(previous_words), len(flat_words)), min_overlap_words - 1, -1):
+            if previous_words[-size:] == flat_words[:size]:
+                overlap = size
+                break
+
+        # drop whole (whitespace separated) words covering the overlapping tokens
+        skip_words, covered = 0, 0
+        while covered < overlap and skip_words < len(words):
+            covered += len(normalized[skip_words])
+            skip_words += 1
+
+        remaining = " ".join(words[skip_words:])
+        if remaining:
+            stitched.append(remaining)
+        previous_words = (previous_words + flat_words[overlap:] if overlap else flat_words)[-max_overlap_words:]
+    return " ".join(stitched)
+
+
+def transcribe_in_parallel(chunks: Iterator, transcribe: Callable, max_workers: int = 4) -> list:
+    """
+    Transcribes chunks on a bounded thread pool, reading the next chunk only when a worker can take it
+    (at most max_workers chunks in flight/in memory). Returns the transcripts in chunk order.
+    """
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = []
+        for index, chunk in enumerate(chunks):
+            if len(in_flight) >= max_workers:
+                in_flight[0].result() # back pressure, wait for the oldest chunk
+                in_flight = [future for future in in_flight if not future.done()]
+            future = executor.submit(transcribe, chunk)
+            results.append(future)
+            in_flight.append(future)
+            print(f"Submitted chunk {index + 1} for transcription...")
+        return [future.result() for future in results]
+
+
+def benchmark(audio_seconds: int = 1200, chunk_seconds: float = 60, latency: float = 0.5, workers=(1, 4, 8)):
+    """
+    Times the pipeline against a local fake transcription endpoint (sleeps latency per request),
+    on a synthetic wav with a quiet gap every few seconds.
+    Run: python TranscriptionOps.py
+    """
+    import json
+    import threading
+    import requests
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    class FakeWhisper(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latency)
+            body = json.dumps({"text": "fake transcript"}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeWhisper)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/v1/audio/transcriptions"
+
+    frame_rate = 16000
+    samples = (np.sin(np.arange(audio_seconds * frame_rate) * 0.05) * 8000).astype(np.int16)
+    samples[(np.arange(len(samples)) // frame_rate) % 7 == 0] = 0 # a quiet second every 7 seconds
+    audio = io.BytesIO()
+    with wave.open(audio, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(frame_rate)
+        wav.writeframes(samples.tobytes())
+
+    def transcribe(chunk):
+        return requests.post(url, files={"file": (chunk.name, chunk)}, data={"model": "whisper-1"}).json()["text"]
+
+    report = {}
+    for max_workers in workers:
+        started = time.perf_counter()
+        texts = transcribe_in_parallel(iter_audio_chunks(audio, "benchmark.wav", chunk_seconds), transcribe, max_workers)
+        report[max_workers] = {"chunks": len(texts), "seconds": round(time.perf_counter() - started, 2)}
+        print(f"workers={max_workers}: {report[max_workers]}")
+    server.shutdown()
+    return report
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -1,24 +1,26 @@
 import streamlit as st
 
+# Timing (imported first so process startup time includes everything below)
+from TimingOps import RerunTimer
+rerun_timer = RerunTimer()
+
 # Data manipulation
 import pandas as pd
-from sklearn.feature_extraction.text import CountVectorizer
 
-# Data visualisations
-import plotly.express as px
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
+# NOTE: heavy libraries (sklearn, wordcloud, matplotlib, plotly, langchain via LLMOps) are imported
+# where their panel renders, so a cold start doesn't pay for panels/actions that aren't used.
 
 # Others
-import re
-import time
 import datetime
 
-# LLM/Agent related
-from LLMOps import audio_to_transcript, generate_transcript_insights, Agent
-
 # db related
 from MongoDBOps import *
+from MongoClientOps import warm_up
+from DataCacheOps import (
+    get_complaints_data, complaints_data_version, get_top_complaint_ngrams, search_complaints, get_complaint_counts,
+    get_meetings_metadata, get_meeting_document, get_meeting_transcript, search_meetings
+)
+from SearchOps import highlight_pattern, highlight_html, paginate_text
 
 
 # page settings
@@ -29,15 +31,51 @@ st.set_page_config(
 )
 
 
+# Connect to mongo & make sure the indexes exist once per process (streamlit caches this across reruns & sessions)
+@st.cache_resource
+def connect_to_db():
+    connected = warm_up()
+    if connected:
+        ensure_indexes()
+    return connected
+
+connect_to_db()
+
+
+# LLM agent & clients are built once per process and shared by every session/rerun
+@st.cache_resource
+def get_agent():
+    from LLMOps import Agent
+    return Agent()
+
+
+# Uploaded recordings are processed by background workers (one queue per process, jobs persisted in mongo).
+# Built on the first submit, or at startup if jobs are waiting, so a plain page view never loads LLMOps.
+@st.cache_resource
+def get_job_queue():
+    from LLMOps import build_meeting_job_queue
+    job_queue = build_meeting_job_queue()
+    job_queue.start() # also resumes jobs left unfinished by a crashed/restarted process
+    return job_queue
+
+
+# checked once per process at startup
+@st.cache_resource
+def resume_meeting_jobs():
+    return get_job_queue() if has_unfinished_meeting_jobs() else None
+
+resume_meeting_jobs()
+
+
 # Display mode color light/dark... might move to session state later
 bg_color = "white"
 n_grams = (3,3) # for word cloud
+wordcloud_top_k = 200 # only the most frequent n-grams are drawn
 
 #  Initialise session state data
 # ===================================================================================================
-# Initial load
-if st.session_state.get("complaints_data") is None:
-    st.session_state.complaints_data = create_complaints_dataframe()
+# Initial load. Data lives in a process wide cache shared by all sessions (DataCacheOps.py), session state only holds references
+st.session_state.complaints_data = get_complaints_data()
 complaints_data = st.session_state.get("complaints_data")
 
 if "meeting_insight_date" not in st.session_state: # Viewing insight for meating
@@ -86,46 +124,51 @@ sidebar_status = st.sidebar.empty()
 
 # Only show submit button if a file is uploaded
 if uploaded_file is not None:
-    # Add submit button to sidebar
+    # Add submit button to sidebar. The recording is queued and processed in the background
+    # (transcript -> insights -> upload -> notify), progress shows in the panel below.
     if st.sidebar.button("Process Audio File"):
-        # Show loading status in sidebar
-        with st.sidebar:
-            with st.spinner("Processing your audio file..."):
-                sidebar_status.text("Step 1: Extracting Transcript...")
-                transcript = audio_to_transcript(uploaded_file)
-                
-                sidebar_status.text("Step 2: Generating Insights...")
-                insights = generate_transcript_insights(transcript)                
-                
-                sidebar_status.text("Step 3: Uploading Insights to DB...")
-                time.sleep(1)
-
-                # Clear status messages and returning info
-                sidebar_status.empty()
-                st.sidebar.success("Process completed; concerned individuals will be notified!") # Probably include the number of users as well.
-                
-
-                meeting_data = {
-                    "Date": meeting_date,
-                    "meeting_id": f"Meeting - {meeting_time}", 
-                    "transcript": transcript, 
-                    "ai_summary": insights.get("Summary", "No summary available"),
-                    "key_points" : insights.get("key_points_discussed", []),
-                    "action_items" : insights.get("action_items", []) 
-                }
-
-                # Uploading the data --- If data says uploaded but doesnt reflect on db, check and move this aspect above process completed.
-                upload_data(meeting_data)
+        job_id = get_job_queue().submit(
+            uploaded_file, uploaded_file.name, {"Date": meeting_date, "meeting_id": f"Meeting - {meeting_time}"}
+        )
+        sidebar_status.success(f"Queued for processing (job {job_id}).")
 
 else:
     st.sidebar.info("No file uploaded yet")
+
+
+# Polls job progress on its own timer; the rest of the page doesn't rerun
+JOB_STATUS_LABELS = {
+    "queued": "⏳ Queued",
+    "transcribing": "🎙 Step 1: Extracting transcript",
+    "summarizing": "🧠 Step 2: Generating insights",
+    "stored": "✅ Done",
+    "failed": "❌ Failed",
+    "dead_letter": "❌ Failed (worker crashed)",
+}
+
+@st.fragment(run_every=JOBS_POLL_SECONDS)
+def job_status_panel():
+    jobs = list_meeting_jobs(limit=5)
+    if not jobs:
+        return
+    st.caption("Recent processing jobs")
+    for job in jobs:
+        line = f"{JOB_STATUS_LABELS.get(job['status'], job['status'])} · {job['meeting']['Date']} {job['meeting']['meeting_id']}"
+        if job["status"] == "stored" and job.get("result"):
+            line += f" · {job['result'].get('sent', 0)} concerned individual(s) notified"
+        elif job.get("error"):
+            line += f" · {job['error'][:80]}" + (" (retrying)" if job["status"] not in ("failed", "dead_letter") else "")
+        st.text(line)
+
+with st.sidebar:
+    job_status_panel()
 st.sidebar.divider()
 
 
 # Extracting past 10 messages then re-ordering so that last entered (most recent) can be first for context.
 context = st.session_state.chat_messages[-10:][::-1]
 formatted_context = "\n".join(f"{message['role']}: {message['content']}" for message in context)
-agent = Agent()
+rerun_timer.mark("setup_and_upload")
 
 # Sidebar for chat
 with st.sidebar:
@@ -158,14 +201,16 @@ with st.sidebar:
         new_prompt_instruction = f"This is the new prompt for you to answer now: {new_prompt}"
 
         # Combine the history and new prompt
-        answer = agent.answer(f"{conversation_history}{new_prompt_instruction}")
+        answer = get_agent().answer(f"{conversation_history}{new_prompt_instruction}")
         st.session_state.chat_messages.append({"role": "assistant", "content": answer})
         messages.chat_message("assistant").write(answer)
+rerun_timer.mark("chat")
         
 
-# KPIs
-active_complaints = len(complaints_data[complaints_data["complaint_status"] == "pending"])
-resolved_complaints = len(complaints_data[complaints_data["complaint_status"] == "resolved"])
+# KPIs (counted server side per day & status, see get_complaint_counts)
+complaint_counts = get_complaint_counts()
+active_complaints = int(complaint_counts.loc[complaint_counts["status"] == "pending", "count"].sum())
+resolved_complaints = int(complaint_counts.loc[complaint_counts["status"] == "resolved", "count"].sum())
 
 st.title("🗣 DialogueDesk Dashboard 📊.")
 st.markdown("##")
@@ -183,13 +228,20 @@ st.divider()
 
 # Button to refresh data
 if st.button("Refresh Data"):
-    st.session_state.complaints_data = create_complaints_dataframe()
+    # only fetches complaints that are new or changed since the last sync
+    st.session_state.complaints_data = get_complaints_data(force_refresh=True)
     complaints_data = st.session_state.get("complaints_data")
+    complaint_counts = get_complaint_counts(force_refresh=True)
+
+
+rerun_timer.mark("kpis")
 
 
 # Graphs building
+import plotly.express as px
+
 # Line graph of number of complaints per day
-complaints_per_day = complaints_data.groupby("date").size().reset_index(name="num_complaints")
+complaints_per_day = complaint_counts.groupby("date")["count"].sum().reset_index(name="num_complaints")
 complaints_per_day_fig = px.line(
     complaints_per_day,
     x='date',
@@ -216,24 +268,34 @@ complaints_per_day_fig.update_layout(
 
 
 # Wordcloud showing most common complaints non-stopword bi and tri-grams.
-complaints_vectorizer = CountVectorizer(ngram_range=n_grams, stop_words="english")
-X_complaints = complaints_vectorizer.fit_transform(complaints_data["complaint_text"])
-complaints_ngrams = complaints_vectorizer.get_feature_names_out()
+# Rendered to PNG once per complaints data version, n-gram counts are updated incrementally. Cached as bytes
+# (cache_data) rather than a matplotlib figure, which is mutable and not safe to share between sessions.
+@st.cache_data(max_entries=2)
+def get_complaints_wordcloud_png(data_version: int) -> bytes:
+    from wordcloud import WordCloud
+    import matplotlib.pyplot as plt
+    import io
 
-# Generate n-gram frequencies
-complaints_ngram_frequencies = dict(zip(complaints_ngrams, X_complaints.toarray().sum(axis=0)))
+    complaints_ngram_frequencies = get_top_complaint_ngrams(top_k=wordcloud_top_k, ngram_range=n_grams)
+    if not complaints_ngram_frequencies:
+        complaints_ngram_frequencies = {"No complaints yet": 1}
 
-# Frequent complaints info
-# sorted_ngrams = sorted(complaints_ngram_frequencies.items(), key=lambda x: x[1], reverse=True)
-# print("N-Grame Frequency", sorted_ngrams[:15])
+    # Frequent complaints info
+    # print("N-Grame Frequency", list(complaints_ngram_frequencies.items())[:15])
 
-# Generate the word cloud
-complaints_wordcloud = WordCloud(width=600, height=470, background_color=bg_color).generate_from_frequencies(complaints_ngram_frequencies)
+    complaints_wordcloud = WordCloud(width=600, height=470, background_color=bg_color).generate_from_frequencies(complaints_ngram_frequencies)
 
-complaints_ngrams_fig, ax = plt.subplots(figsize=(10, 5))
-ax.imshow(complaints_wordcloud, interpolation="bilinear")
-ax.set_title("Magnitude of Complaints", fontsize=15)
-ax.axis("off")
+    complaints_ngrams_fig, ax = plt.subplots(figsize=(10, 5))
+    ax.imshow(complaints_wordcloud, interpolation="bilinear")
+    ax.set_title("Magnitude of Complaints", fontsize=15)
+    ax.axis("off")
+
+    png = io.BytesIO()
+    complaints_ngrams_fig.savefig(png, format="png", bbox_inches="tight")
+    plt.close(complaints_ngrams_fig)
+    return png.getvalue()
+
+complaints_ngrams_png = get_complaints_wordcloud_png(complaints_data_version())
 
 
 # Display Visuals:
@@ -241,14 +303,23 @@ second_first_col, second_second_col, second_third_col = st.columns(3)
 with second_first_col:
     st.plotly_chart(complaints_per_day_fig)
 with second_second_col:
-    st.pyplot(complaints_ngrams_fig)
+    st.image(complaints_ngrams_png, use_container_width=True)
 with second_third_col:
-    # searchable dataframe for event reviews
-    complaints_search_term = st.text_input("Search complaints:", "").split(" ")
-
-    # Filter DataFrame based on search term
-    if complaints_search_term:
-        complaints_filtered_df = complaints_data[complaints_data["complaint_text"].apply(lambda x: all(term.lower() in str(x).lower() for term in complaints_search_term))]
+    # searchable dataframe for event reviews (all terms must match, "quoted phrases" match exactly; ranked by relevance)
+    complaints_search_query = st.text_input("Search complaints:", "").strip()
+
+    if complaints_search_query:
+        search_page_size = 50
+        if st.session_state.get("complaints_search_query") != complaints_search_query: # new query, back to the first page
+            st.session_state.complaints_search_query = complaints_search_query
+            st.session_state.complaints_search_page = 1
+        search_page = st.session_state.get("complaints_search_page", 1)
+        complaints_filtered_df, complaints_search_total = search_complaints(complaints_search_query, page=search_page, page_size=search_page_size)
+        search_pages = max(1, -(-complaints_search_total // search_page_size))
+        if search_pages > 1:
+            st.number_input(f"Page (of {search_pages}), {complaints_search_total} matches", min_value=1, max_value=search_pages, key="complaints_search_page")
+        else:
+            st.caption(f"{complaints_search_total} matches")
     else:
         complaints_filtered_df = complaints_data
 
@@ -258,6 +329,9 @@ with second_third_col:
 st.divider()
 
 
+rerun_timer.mark("complaints_charts")
+
+
 # Meeting insights section #
 st.markdown("<h2 style='text-align: center;'>Meeting Insights Section</h2>", unsafe_allow_html=True)
 date_filter_col, meeting_id_filter, _, _, _, _, = st.columns(6) # temporaty hack to make the date selection column look smaller.
@@ -275,30 +349,20 @@ with date_filter_col:
 
 
 # Check if the selected date has more than one meeting recorded for the day... select meeting id pops up beside the date selection.
-days_meetings_meta = meetings_metadata_by_date(meeting_insight_date)
+days_meetings_meta = get_meetings_metadata(meeting_insight_date) or {"no_of_meetings": 0, "meeting_ids": []}
 no_of_meetings, meeting_ids = days_meetings_meta["no_of_meetings"], days_meetings_meta["meeting_ids"]
 
 if no_of_meetings > 1:
     with meeting_id_filter:
         selected_meeting_id = st.selectbox("Select Meeting ID:", meeting_ids)
 else:
-    selected_meeting_id = meeting_ids
-
-
-# Check if there is need to fetch new data [state change or meeting_date (upload date) = meeting_insight_date (selected date for insight)]
-if (
-    meeting_insight_date != st.session_state.meeting_insight_date
-    or selected_meeting_id != st.session_state.selected_meeting_id
-    or (meeting_date == meeting_insight_date and st.session_state.get("transcript") == "None available at the moment") # meaning that the just uploaded data hasnt been retrieved
-):
-    # Update session state with new parameters
-    st.session_state.meeting_insight_date = meeting_insight_date
-    st.session_state.selected_meeting_id = selected_meeting_id
-
-    # Retrieve and store data in session state
-    st.session_state.meeting_insights = search_by_date_and_id(
-        f"{meeting_insight_date}, {selected_meeting_id}"
-    )
+    selected_meeting_id = meeting_ids[0] if meeting_ids else None
+
+
+# Shared cache hit unless the date/meeting is new to this process (uploads invalidate the meetings cache)
+st.session_state.meeting_insight_date = meeting_insight_date
+st.session_state.selected_meeting_id = selected_meeting_id
+st.session_state.meeting_insights = get_meeting_document(meeting_insight_date, selected_meeting_id)
 
 meeting_insights = st.session_state.meeting_insights
 mode = st.radio("Choose mode", ("Transcript", "Summary"))
@@ -306,9 +370,11 @@ mode = st.radio("Choose mode", ("Transcript", "Summary"))
 if meeting_insights:
     meeting_key_points = meeting_insights["key_points"]
     meeting_action_items = meeting_insights["action_items"]
-    meeting_transcript = meeting_insights["transcript"]
     meeting_ai_summary = meeting_insights["ai_summary"]
-    text_content = meeting_transcript if mode == "Transcript" else meeting_ai_summary
+    if mode == "Transcript": # only fetched when it's shown
+        text_content = get_meeting_transcript(meeting_insight_date, selected_meeting_id) or "No transcript available."
+    else:
+        text_content = meeting_ai_summary
 else:
     meeting_key_points = []
     meeting_action_items = []
@@ -345,62 +411,71 @@ st.markdown("""
 
 def highlight_text(text, search_term):
     """
-    Highlight search term in text while preserving newlines.
+    Highlight search term in text (html escaped, newlines preserved) in a single pass of one compiled pattern.
     Returns tuple of (highlighted_text, match_count).
     """
-    if not search_term:
-        return text, 0
-    
-    try:
-        # Escape special characters in search term
-        search_term = re.escape(search_term)
-        
-        # Split text into lines to preserve newlines
-        lines = text.split('\n')
-        highlighted_lines = []
-        match_count = 0
-        
-        for line in lines:
-            # Count matches in this line
-            matches = len(re.findall(search_term, line, re.IGNORECASE))
-            match_count += matches
-            
-            # Replace matches with highlighted version
-            if matches > 0:
-                pattern = f'({search_term})'
-                repl = r'<span class="highlight">\1</span>'
-                line = re.sub(pattern, repl, line, flags=re.IGNORECASE)
-            
-            highlighted_lines.append(line)
-        
-        return '\n'.join(highlighted_lines), match_count
-    except Exception as e:
-        st.error(f"Search error: {str(e)}")
-        return text, 0
+    return highlight_html(text, highlight_pattern([search_term], whole_words=False) if search_term else None)
+
+
+transcript_page_chars = 4000 # long transcripts are shown a page at a time
 
 
 # Create a container for the search interface
 search_container = st.container()
 with search_container:
     # Create a search input field
-    search_term = st.text_input(f"Search in {mode}:", "")
+    search_term = st.text_input(f"Search in {mode}:", "").strip()
 
     try:
-        # Highlight matches and count them
-        highlighted_text, match_count = highlight_text(text_content, search_term.strip())
-        
+        pages = paginate_text(text_content, transcript_page_chars)
+        match_pattern = highlight_pattern([search_term], whole_words=False) if search_term else None
+        match_starts = [match.start() for match in match_pattern.finditer(text_content)] if match_pattern else []
+        pages_with_matches = [number for number, (start, end) in enumerate(pages, 1) if any(start <= position < end for position in match_starts)]
+
         # Display search stats if there's a search term
         if search_term:
-            st.markdown(f'<div class="search-stats">Found {match_count} matches</div>', 
+            pages_info = f" on page(s) {', '.join(map(str, pages_with_matches[:20]))}" if len(pages) > 1 and pages_with_matches else ""
+            st.markdown(f'<div class="search-stats">Found {len(match_starts)} matches{pages_info}</div>',
                        unsafe_allow_html=True)
-        
+
+        page_number = 1
+        if len(pages) > 1:
+            page_number = st.number_input(
+                f"Page (of {len(pages)})", min_value=1, max_value=len(pages),
+                value=pages_with_matches[0] if pages_with_matches else 1,
+                key=f"meeting_text_page|{selected_meeting_id}|{mode}|{search_term}"
+            )
+        page_start, page_end = pages[page_number - 1]
+
+        # Highlight matches on the displayed page only
+        highlighted_text, _ = highlight_text(text_content[page_start:page_end], search_term)
+
         # Display the text with highlights
         st.markdown(f"### Meeting {mode}.")
         st.markdown(f'<div class="fixed-text-box">{highlighted_text}</div>', 
                    unsafe_allow_html=True)
     except Exception as e:
         st.error(f"An error occurred: {str(e)}")
-    
+
+
+# Search across every meeting's transcript & summary (ranked, with snippets)
+with st.expander("Search all meetings"):
+    all_meetings_query = st.text_input("Search all transcripts & summaries (\"quoted phrases\" match exactly):", "").strip()
+    if all_meetings_query:
+        if st.session_state.get("all_meetings_query") != all_meetings_query: # new query, back to the first page
+            st.session_state.all_meetings_query = all_meetings_query
+            st.session_state.all_meetings_page = 1
+        meeting_hits, meeting_hits_total = search_meetings(all_meetings_query, page=st.session_state.get("all_meetings_page", 1), page_size=10)
+
+        meeting_hit_pages = max(1, -(-meeting_hits_total // 10))
+        st.markdown(f'<div class="search-stats">{meeting_hits_total} matching meeting(s)</div>', unsafe_allow_html=True)
+        if meeting_hit_pages > 1:
+            st.number_input(f"Page (of {meeting_hit_pages})", min_value=1, max_value=meeting_hit_pages, key="all_meetings_page")
+        for hit in meeting_hits:
+            field_name = "Summary" if hit["field"] == "ai_summary" else "Transcript"
+            st.markdown(f"**{hit['date']} · {hit['meeting_id']}** ({field_name}, score {hit['score']})")
+            st.markdown(f'<div class="search-stats">{hit["snippet"]}</div>', unsafe_allow_html=True)
+
 
 # Creating df containing Key Points and Action Items
 key_points_df = pd.DataFrame(meeting_key_points, columns=["Key Points"])
@@ -413,4 +488,12 @@ third_first_col, third_second_col = st.columns(2)
 with third_first_col:
     st.dataframe(key_points_df, use_container_width = True, height = 200)
 with third_second_col:
-    st.dataframe(action_points_df, use_container_width = True, height = 200)
\ No newline at end of file
+    st.dataframe(action_points_df, use_container_width = True, height = 200)
+rerun_timer.mark("meeting_insights")
+
+
+# Run timings, to keep startup/rerun regressions visible
+run_timings = rerun_timer.report()
+if SHOW_RUN_TIMINGS:
+    with st.sidebar.expander("Run timings (ms)"):
+        st.json(run_timings)